@@ -1 +0,0 @@
-from .LCDI2C_backpack import LCDI2C_backpack
\ No newline at end of file
@@ -271,8 +271,8 @@ def start_programme(num:int, to_open:list, to_close:list, airmode:bool,v4vmanu:b
         now = time.monotonic()
         elapsed_sec = int(now - start_ts)
         
+        # ligne 1 déjà écrite avant la boucle: seule la ligne 2 change (1x/s)
         if elapsed_sec != last_sec:
-            write_line(lcd, lcd.LCD_LINE_1, f"Programme {num}")
             write_line(lcd, lcd.LCD_LINE_2, f"{_mmss(elapsed_sec)} X L/m")
             last_sec = elapsed_sec
 
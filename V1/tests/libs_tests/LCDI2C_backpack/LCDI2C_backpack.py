@@ -5,9 +5,18 @@
 #  Supports 16x2 and 20x4 screens.
 #
 #--------------------------------------
-import smbus
+from smbus2 import SMBus
 import time
 
+# One SMBus per bus number (a single open of /dev/i2c-N), shared by all instances
+_BUS_CACHE = {}
+
+def _get_bus(bus_id):
+  bus = _BUS_CACHE.get(bus_id)
+  if bus is None:
+    bus = _BUS_CACHE[bus_id] = SMBus(bus_id)
+  return bus
+
 
 class LCDI2C_backpack(object):
   # Define some device parameters
@@ -32,10 +41,6 @@ class LCDI2C_backpack(object):
   E_PULSE = 0.0005
   E_DELAY = 0.0005
 
-  #Open I2C interface
-  #bus = smbus.SMBus(0)  # Rev 1 Pi uses 0
-  bus = smbus.SMBus(1) # Rev 2 Pi uses 1
-
   LCD_CURSORSHIFT = 0x10
   LCD_DISPLAYMOVE = 0x08
   LCD_MOVERIGHT = 0x04
@@ -44,8 +49,10 @@ class LCDI2C_backpack(object):
   LCD_ENTRYSHIFTINCREMENT = 0x01
   LCD_ENTRYMODESET = 0x04
 
-  def __init__(self, I2C_ADDR):
+  def __init__(self, I2C_ADDR, I2C_BUS=1):
+    # I2C_BUS: 1 on Rev 2 Pi and later, 0 on Rev 1
     self.I2C_ADDR = I2C_ADDR;
+    self.bus = _get_bus(I2C_BUS)
     self.init()
     self.clear()
 
@@ -91,20 +98,25 @@ class LCDI2C_backpack(object):
     self.lcd_byte(self.LCD_CURSORSHIFT | self.LCD_DISPLAYMOVE | self.LCD_MOVELEFT, self.LCD_CMD)
 
   def message(self, text):
-    # Send string to display
-    for char in text:
-            if char == '\n':
-                self.lcd_byte(0xC0, self.LCD_CMD)  # next line
-            else:
-                self.lcd_byte(ord(char), self.LCD_CHR)
+    # Send string to display: split once on '\n' (each one moves to line 2),
+    # then write each chunk as a whole
+    first, *rest = text.split('\n')
+    self._write_chars(first)
+    for part in rest:
+      self.lcd_byte(self.LCD_LINE_2, self.LCD_CMD)  # next line
+      self._write_chars(part)
 
   def lcd_string(self, message,line):
     # Send string to display
-    message = message.ljust(self.LCD_WIDTH," ")
+    message = message.ljust(self.LCD_WIDTH," ")[:self.LCD_WIDTH]
     self.lcd_byte(line, self.LCD_CMD)
 
-    for i in range(self.LCD_WIDTH):
-      self.lcd_byte(ord(message[i]),self.LCD_CHR)
+    self._write_chars(message)
+
+  def _write_chars(self, text):
+    # Encode once: iterating bytes yields ints (no per-char indexing or ord)
+    for b in text.encode('latin-1', 'replace'):
+      self.lcd_byte(b,self.LCD_CHR)
 
 
   def clear(self):
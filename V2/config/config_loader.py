@@ -1,12 +1,31 @@
 # config/config_loader.py
 from __future__ import annotations
 
-from dataclasses import dataclass
+import functools
+import logging
+import os
+import pickle
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Optional
+from types import MappingProxyType, SimpleNamespace
+from typing import Any, Dict, Mapping, Optional
 
 import yaml
 
+# Loader C (libyaml) si disponible, ~10x plus rapide que le SafeLoader pur Python.
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:  # PyYAML compilé sans libyaml
+    from yaml import SafeLoader as _Loader
+
+log = logging.getLogger("machine")
+
+# dict (pendant le chargement) ou MappingProxyType (LoadedConfig figé)
+_MAPPING_TYPES = (dict, MappingProxyType)
+
+# Cache disque du config fusionné (à incrémenter si la fusion/coercition change)
+CACHE_VERSION = 1
+
 
 class ConfigError(Exception):
     pass
@@ -14,26 +33,41 @@ class ConfigError(Exception):
 
 def _deep_merge(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Fusion récursive simple:
-      - si deux valeurs sont des dict: merge récursif
+    Fusion simple (itérative, sans récursion):
+      - si deux valeurs sont des dict: merge
       - sinon: override écrase base
+    Seuls les sous-dicts effectivement fusionnés sont copiés (base n'est jamais modifié).
     """
-    out = dict(base)
-    for k, v in override.items():
-        if isinstance(v, dict) and isinstance(out.get(k), dict):
-            out[k] = _deep_merge(out[k], v)
-        else:
-            out[k] = v
+    out = {**base}
+    stack = [(out, override)]
+    while stack:
+        dst, src = stack.pop()
+        for k, v in src.items():
+            dv = dst.get(k)
+            if type(v) is dict and type(dv) is dict:
+                nd = {**dv}
+                dst[k] = nd
+                stack.append((nd, v))
+            else:
+                dst[k] = v
     return out
 
 
+@functools.lru_cache(maxsize=256)
+def _split_path(path: str) -> tuple:
+    """
+    "a.b.c" -> ("a", "b", "c"), mémoïsé (les appelants utilisent des chemins littéraux).
+    """
+    return tuple(path.split("."))
+
+
 def _require(cfg: Dict[str, Any], path: str) -> Any:
     """
     Récupère une clé via "a.b.c". Lève ConfigError si absent.
     """
     cur: Any = cfg
-    for part in path.split("."):
-        if not isinstance(cur, dict) or part not in cur:
+    for part in _split_path(path):
+        if not isinstance(cur, _MAPPING_TYPES) or part not in cur:
             raise ConfigError(f"Clé manquante dans config: {path}")
         cur = cur[part]
     return cur
@@ -41,21 +75,48 @@ def _require(cfg: Dict[str, Any], path: str) -> Any:
 
 def _get(cfg: Dict[str, Any], path: str, default: Any) -> Any:
     cur: Any = cfg
-    for part in path.split("."):
-        if not isinstance(cur, dict) or part not in cur:
+    for part in _split_path(path):
+        if not isinstance(cur, _MAPPING_TYPES) or part not in cur:
             return default
         cur = cur[part]
     return cur
 
 
+def _freeze(d: Mapping[str, Any]) -> Mapping[str, Any]:
+    """
+    Copie en lecture seule (MappingProxyType), récursive: partageable entre threads.
+    """
+    return MappingProxyType({k: _freeze(v) if isinstance(v, _MAPPING_TYPES) else v for k, v in d.items()})
+
+
+def _to_namespace(v: Any) -> Any:
+    """
+    Mapping -> SimpleNamespace (accès cfg.ns.i2c.bus).
+    Les mappings dont les clés ne sont pas des identifiants (ex: programs: {1: ...})
+    restent des mappings.
+    """
+    if not isinstance(v, _MAPPING_TYPES):
+        return v
+    if all(isinstance(k, str) and k.isidentifier() for k in v):
+        return SimpleNamespace(**{k: _to_namespace(x) for k, x in v.items()})
+    return v
+
+
 @dataclass(frozen=True)
 class LoadedConfig:
     """
     Contient:
-      - raw: dict complet (facile à inspecter)
-      - helpers: getters typés
+      - raw: config complet figé (MappingProxyType, facile à inspecter)
+      - ns: même contenu en accès attribut, résolu une fois (ex: cfg.ns.i2c.bus)
+      - helpers: getters typés (chemins dynamiques "a.b.c")
     """
-    raw: Dict[str, Any]
+    raw: Mapping[str, Any]
+    ns: SimpleNamespace = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        frozen = _freeze(self.raw)
+        object.__setattr__(self, "raw", frozen)
+        object.__setattr__(self, "ns", _to_namespace(frozen))
 
     def get(self, path: str, default: Any = None) -> Any:
         return _get(self.raw, path, default)
@@ -74,6 +135,81 @@ class LoadedConfig:
         return str(self.get(path, default))
 
 
+def _cache_key(p: Path) -> tuple:
+    st = p.stat()
+    return (CACHE_VERSION, str(p.resolve()), st.st_mtime_ns, st.st_size)
+
+
+def _cache_read(cache: Path, key: tuple) -> Optional[Dict[str, Any]]:
+    """
+    Retourne le dict fusionné si le cache correspond à key, sinon None.
+    Toute erreur (absent, corrompu, ancienne version) => None.
+    """
+    try:
+        with cache.open("rb") as f:
+            cached_key, merged = pickle.load(f)
+    except Exception:
+        return None
+    if cached_key != key or not isinstance(merged, dict):
+        return None
+    return merged
+
+
+def _cache_write(cache: Path, key: tuple, merged: Dict[str, Any]) -> None:
+    """
+    Écriture atomique (tmp + os.replace). Échec silencieux (FS read-only, droits...).
+    """
+    tmp = cache.with_name(cache.name + ".tmp")
+    try:
+        with tmp.open("wb") as f:
+            pickle.dump((key, merged), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache)
+    except Exception as e:
+        log.debug("Cache config non écrit (%s): %s", cache, e)
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+
+
+def _upper_str(v: Any) -> str:
+    return str(v).upper()
+
+
+# Champs typés du config: (chemin, conversion, défaut si absent)
+_SCHEMA = (
+    ("i2c.bus", int, 1),
+    ("i2c.mcp1", int, 0x24),
+    ("i2c.mcp2", int, 0x25),
+    ("i2c.mcp3", int, 0x26),
+    ("i2c.lcd", int, 0x27),
+    ("gpio.lgpio_chip", int, 0),
+    ("gpio.flowmeter", int, 21),
+    ("gpio.relays.air", int, 16),
+    ("gpio.relays.pump", int, 20),
+    ("motors.microsteps_per_rev", int, 3200),
+    ("motors.ena_settle_ms", int, 10),
+    ("motors.dir_setup_us", int, 5),
+    ("inputs.poll_hz", int, 100),
+    ("inputs.debounce_ms", int, 30),
+    ("flowmeter.pulses_per_liter", float, 12.0),
+    ("flowmeter.sample_period_s", float, 1.0),
+    ("flowmeter.edge", _upper_str, "FALLING"),
+)
+
+
+def _coerce(merged: Dict[str, Any]) -> None:
+    """
+    Convertit en place les champs de _SCHEMA au bon type (défaut si absent).
+    """
+    for path, conv, default in _SCHEMA:
+        *parents, leaf = _split_path(path)
+        d = merged
+        for part in parents:
+            d = d[part]
+        d[leaf] = conv(d.get(leaf, default))
+
+
 DEFAULT_CONFIG: Dict[str, Any] = {
     "logging": {"dir": "/var/log/machine_ctrl", "level": "INFO"},
     "i2c": {"bus": 1, "mcp1": 0x24, "mcp2": 0x25, "mcp3": 0x26, "lcd": 0x27},
@@ -99,11 +235,14 @@ def load_config(path: str = "config/config.yaml", defaults: Optional[Dict[str, A
     Charge un YAML et fusionne avec des defaults.
     - Si le fichier n'existe pas: retourne defaults.
     - Si YAML invalide: lève ConfigError.
+    - Le résultat fusionné est mis en cache dans <path>.cache.pkl (clé: chemin, mtime, taille)
+      pour éviter le parse YAML aux boots suivants (defaults par défaut uniquement).
 
     Utilisation:
         from config.config_loader import load_config
         cfg = load_config("config/config.yaml")
-        i2c_bus = cfg.get_int("i2c.bus", 1)
+        i2c_bus = cfg.ns.i2c.bus                   # champs connus: accès attribut
+        buzzer = cfg.get_int("gpio.buzzer", 26)    # champs optionnels: getter + défaut
     """
     base = dict(DEFAULT_CONFIG if defaults is None else defaults)
 
@@ -111,9 +250,20 @@ def load_config(path: str = "config/config.yaml", defaults: Optional[Dict[str, A
     if not p.exists():
         return LoadedConfig(raw=base)
 
+    use_cache = defaults is None
+    cache = p.with_name(p.name + ".cache.pkl")
+    if use_cache:
+        key = _cache_key(p)
+        cached = _cache_read(cache, key)
+        if cached is not None:
+            return LoadedConfig(raw=cached)
+
+    if _Loader is yaml.SafeLoader:
+        log.debug("libyaml indisponible: fallback sur yaml.SafeLoader (pur Python)")
+
     try:
         with p.open("r", encoding="utf-8") as f:
-            user_cfg = yaml.safe_load(f) or {}
+            user_cfg = yaml.load(f, Loader=_Loader) or {}
     except Exception as e:
         raise ConfigError(f"Impossible de lire {path}: {e}") from e
 
@@ -128,29 +278,12 @@ def load_config(path: str = "config/config.yaml", defaults: Optional[Dict[str, A
         raise ConfigError("gpio.step_pins doit être un dict non vide")
 
     # Convertit quelques champs au bon type (robustesse)
-    merged["i2c"]["bus"] = int(_get(merged, "i2c.bus", 1))
-    merged["i2c"]["mcp1"] = int(_get(merged, "i2c.mcp1", 0x24))
-    merged["i2c"]["mcp2"] = int(_get(merged, "i2c.mcp2", 0x25))
-    merged["i2c"]["mcp3"] = int(_get(merged, "i2c.mcp3", 0x26))
-    merged["i2c"]["lcd"] = int(_get(merged, "i2c.lcd", 0x27))
-
-    merged["gpio"]["lgpio_chip"] = int(_get(merged, "gpio.lgpio_chip", 0))
-    merged["gpio"]["flowmeter"] = int(_get(merged, "gpio.flowmeter", 21))
-    merged["gpio"]["relays"]["air"] = int(_get(merged, "gpio.relays.air", 16))
-    merged["gpio"]["relays"]["pump"] = int(_get(merged, "gpio.relays.pump", 20))
-
-    for k, v in list(merged["gpio"]["step_pins"].items()):
-        merged["gpio"]["step_pins"][k] = int(v)
-
-    merged["motors"]["microsteps_per_rev"] = int(_get(merged, "motors.microsteps_per_rev", 3200))
-    merged["motors"]["ena_settle_ms"] = int(_get(merged, "motors.ena_settle_ms", 10))
-    merged["motors"]["dir_setup_us"] = int(_get(merged, "motors.dir_setup_us", 5))
-
-    merged["inputs"]["poll_hz"] = int(_get(merged, "inputs.poll_hz", 100))
-    merged["inputs"]["debounce_ms"] = int(_get(merged, "inputs.debounce_ms", 30))
-
-    merged["flowmeter"]["pulses_per_liter"] = float(_get(merged, "flowmeter.pulses_per_liter", 12.0))
-    merged["flowmeter"]["sample_period_s"] = float(_get(merged, "flowmeter.sample_period_s", 1.0))
-    merged["flowmeter"]["edge"] = str(_get(merged, "flowmeter.edge", "FALLING")).upper()
+    _coerce(merged)
+
+    for k, v in list(step_pins.items()):
+        step_pins[k] = int(v)
+
+    if use_cache:
+        _cache_write(cache, key, merged)
 
     return LoadedConfig(raw=merged)
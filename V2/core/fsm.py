@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import time
 from dataclasses import dataclass
-from typing import Optional, Dict
+from typing import Callable, Optional, Dict, Tuple
 
 from hw.inputs import Inputs, InputEvent
 from hw.leds import ProgramLeds
@@ -18,42 +18,27 @@ PROGRAMS: Dict[int, str] = {
 }
 
 
-def _safe_set_pump(relays, on: bool) -> None:
+def _resolve_relay_setter(relays, what: str, label: str) -> Callable[[bool], None]:
     """
     Adaptateur minimal pour ta librairie relays_critical.py.
-    On ne connaît pas encore ton API exacte, donc on tente plusieurs méthodes.
+    L'API exacte est résolue une seule fois (à la construction de la FSM):
+      set_<what>(on) / <what>_on() + <what>_off() / all_off() (arrêt seulement)
+    Retourne un setter setter(on: bool).
     """
-    if hasattr(relays, "set_pump"):
-        relays.set_pump(on)
-        return
-    if on and hasattr(relays, "pump_on"):
-        relays.pump_on()
-        return
-    if (not on) and hasattr(relays, "pump_off"):
-        relays.pump_off()
-        return
-    # fallback: all_off
-    if hasattr(relays, "all_off") and not on:
-        relays.all_off()
-        return
-    raise AttributeError("Impossible de piloter la pompe (API relais inconnue)")
-
-
-def _safe_set_air(relays, on: bool) -> None:
-    if hasattr(relays, "set_air"):
-        relays.set_air(on)
-        return
-    if on and hasattr(relays, "air_on"):
-        relays.air_on()
-        return
-    if (not on) and hasattr(relays, "air_off"):
-        relays.air_off()
-        return
-    # fallback: all_off
-    if hasattr(relays, "all_off") and not on:
-        relays.all_off()
-        return
-    raise AttributeError("Impossible de piloter l'air (API relais inconnue)")
+    set_fn = getattr(relays, f"set_{what}", None)
+    if set_fn is not None:
+        return set_fn
+
+    on_fn = getattr(relays, f"{what}_on", None)
+    off_fn = getattr(relays, f"{what}_off", None) or getattr(relays, "all_off", None)
+
+    def _set(on: bool) -> None:
+        fn = on_fn if on else off_fn
+        if fn is None:
+            raise AttributeError(f"Impossible de piloter {label} (API relais inconnue)")
+        fn()
+
+    return _set
 
 
 @dataclass
@@ -87,10 +72,17 @@ class MachineFSM:
 
         self.state = MachineState()
 
+        # setters relais résolus une fois (pas de hasattr à chaque commande)
+        self._set_pump = _resolve_relay_setter(relays, "pump", "la pompe")
+        self._set_air = _resolve_relay_setter(relays, "air", "l'air")
+
         # rafraîchissement LCD
         self._last_lcd_update = 0.0
         self.lcd_period_s = 1.0
 
+        # lignes inchangées: filtrées par le driver LCD (cache par ligne), pas ici
+        self._lcd_addrs = (lcd.LCD_LINE_1, lcd.LCD_LINE_2, lcd.LCD_LINE_3, lcd.LCD_LINE_4)
+
         # choix: pompe ON quand un programme tourne ?
         self.pump_on_when_running = True
 
@@ -159,7 +151,7 @@ class MachineFSM:
 
         if self.pump_on_when_running:
             try:
-                _safe_set_pump(self.relays, True)
+                self._set_pump(True)
             except Exception as e:
                 self.log.error("Impossible d'activer pompe: %s", e)
 
@@ -177,7 +169,7 @@ class MachineFSM:
 
         # pompe OFF
         try:
-            _safe_set_pump(self.relays, False)
+            self._set_pump(False)
         except Exception as e:
             self.log.error("Impossible de couper pompe: %s", e)
 
@@ -192,27 +184,34 @@ class MachineFSM:
     # ------------------ LCD ------------------
 
     def _update_lcd(self, now_mono: float) -> None:
+        idle = self.state.mode == "IDLE"
         try:
-            flow_l_min = float(self.flowmeter.get_flow_l_min())
+            # débit non affiché en IDLE: pas lu
+            flow_l_min = 0.0 if idle else float(self.flowmeter.get_flow_l_min())
             total_l = float(self.flowmeter.get_total_liters())
         except Exception:
             flow_l_min = 0.0
             total_l = 0.0
 
-        if self.state.mode == "IDLE":
-            self._lcd_idle(total_l)
+        if idle:
+            lines = self._lcd_idle(total_l)
         else:
             prog = int(self.state.active_program or 0)
             elapsed = now_mono - self.state.program_start_mono
-            self._lcd_run(prog, elapsed, flow_l_min, total_l)
+            lines = self._lcd_run(prog, elapsed, flow_l_min, total_l)
+
+        for addr, text in zip(self._lcd_addrs, lines):
+            self.lcd.lcd_string(text, addr)
 
-    def _lcd_idle(self, total_l: float) -> None:
-        self.lcd.lcd_string("Choix programme", self.lcd.LCD_LINE_1)
-        self.lcd.lcd_string("1..5", self.lcd.LCD_LINE_2)
-        self.lcd.lcd_string(f"Total: {total_l:6.1f} L", self.lcd.LCD_LINE_3)
-        self.lcd.lcd_string("Pompe: OFF", self.lcd.LCD_LINE_4)
+    def _lcd_idle(self, total_l: float) -> Tuple[str, str, str, str]:
+        return (
+            "Choix programme",
+            "1..5",
+            f"Total: {total_l:6.1f} L",
+            "Pompe: OFF",
+        )
 
-    def _lcd_run(self, prog: int, elapsed_s: float, flow_l_min: float, total_l: float) -> None:
+    def _lcd_run(self, prog: int, elapsed_s: float, flow_l_min: float, total_l: float) -> Tuple[str, str, str, str]:
         name = PROGRAMS.get(prog, f"Prog {prog}")
         # 20 char max (LCD 20x4)
         line1 = f"{prog}:{name}"[:20]
@@ -223,7 +222,4 @@ class MachineFSM:
         line3 = f"Debit: {flow_l_min:6.1f}L/m"[:20]
         line4 = f"Total: {total_l:6.1f}L"[:20]
 
-        self.lcd.lcd_string(line1, self.lcd.LCD_LINE_1)
-        self.lcd.lcd_string(line2, self.lcd.LCD_LINE_2)
-        self.lcd.lcd_string(line3, self.lcd.LCD_LINE_3)
-        self.lcd.lcd_string(line4, self.lcd.LCD_LINE_4)
+        return line1, line2, line3, line4
@@ -1,10 +1,17 @@
 # core/logging_setup.py
 from __future__ import annotations
 
+import atexit
 import logging
+import logging.handlers
 import os
-from datetime import datetime
+import queue
+import time
 from pathlib import Path
+from typing import Optional
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
 
 
 def setup_logging(log_dir: str = "/var/log/machine_ctrl", level: str = "INFO") -> logging.Logger:
@@ -13,17 +20,23 @@ def setup_logging(log_dir: str = "/var/log/machine_ctrl", level: str = "INFO") -
       - sortie console
       - 1 fichier log par boot, nommé boot_YYYYMMDD_HHMMSS.log
 
+    Les handlers (formatage + écriture) tournent dans un thread QueueListener:
+    log.info() ne fait qu'un put() dans une queue, sans I/O sur le thread appelant
+    (FSM, moteurs). stop_logging() vide la queue (appelé aussi à la sortie).
+
     Usage :
       log = setup_logging(...)
       log.info("message")
     """
+    global _listener
     Path(log_dir).mkdir(parents=True, exist_ok=True)
 
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    ts = time.strftime("%Y%m%d_%H%M%S", time.localtime())
     filename = os.path.join(log_dir, f"boot_{ts}.log")
 
     logger = logging.getLogger("machine")
     logger.setLevel(getattr(logging, level.upper(), logging.INFO))
+    stop_logging()
     logger.handlers.clear()
     logger.propagate = False
 
@@ -39,8 +52,27 @@ def setup_logging(log_dir: str = "/var/log/machine_ctrl", level: str = "INFO") -
     fh.setFormatter(fmt)
     fh.setLevel(logger.level)
 
-    logger.addHandler(ch)
-    logger.addHandler(fh)
+    # SimpleQueue: put() sans Condition ni compteur de tâches (le moins coûteux côté appelant)
+    q: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(q))
+
+    _listener = logging.handlers.QueueListener(q, ch, fh, respect_handler_level=True)
+    _listener.start()
 
     logger.info("Logging démarré: %s", filename)
     return logger
+
+
+def stop_logging() -> None:
+    """
+    Arrête le thread d'écriture des logs après avoir vidé la queue.
+    """
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for h in listener.handlers:
+            h.close()
+
+
+atexit.register(stop_logging)
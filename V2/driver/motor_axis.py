@@ -31,16 +31,17 @@ class MotorAxis:
         self.stepgen = stepgen
 
     def enable(self) -> None:
-        self.mcp.motor_set_enable(self.cfg.index, True)
-        time.sleep(self.cfg.ena_settle_ms / 1000.0)
+        # attente ENA uniquement sur une vraie transition désactivé -> activé
+        if self.mcp.motor_set_enable(self.cfg.index, True):
+            time.sleep(self.cfg.ena_settle_ms / 1000.0)
 
     def disable(self) -> None:
         self.mcp.motor_set_enable(self.cfg.index, False)
 
     def set_dir(self, direction: int) -> None:
-        self.mcp.motor_set_dir(self.cfg.index, direction, invert=self.cfg.invert_dir)
-        # DM860H demande ~2 us min, on met un peu plus (dir_setup_us)
-        time.sleep(self.cfg.dir_setup_us / 1_000_000.0)
+        if self.mcp.motor_set_dir(self.cfg.index, direction, invert=self.cfg.invert_dir):
+            # DM860H demande ~2 us min, on met un peu plus (dir_setup_us)
+            time.sleep(self.cfg.dir_setup_us / 1_000_000.0)
 
     def is_busy(self) -> bool:
         return self.stepgen.is_busy(self.cfg.motor_id)
@@ -61,19 +62,25 @@ class MotorAxis:
             return
 
         direction = 1 if steps > 0 else 0
-        nsteps = abs(int(steps))
 
         self.enable()
         self.set_dir(direction)
 
+        self.start_steps(abs(int(steps)), max_steps_s, accel_steps_s2)
+
+    def start_steps(self, nsteps: int, max_steps_s: float, accel_steps_s2: float) -> None:
+        """
+        Lance uniquement les pulses STEP (ENA/DIR supposés déjà positionnés,
+        ex: par Motors.move_all_turns en écriture groupée).
+        """
+        if nsteps <= 0:
+            return
         prof = MotionProfile(max_steps_s=float(max_steps_s), accel_steps_s2=float(accel_steps_s2))
         self.stepgen.move_steps(self.cfg.motor_id, nsteps, prof)
 
-    def move_turns(self, turns: float, max_rpm: float, accel_rpm_s: float) -> None:
+    def turns_to_motion(self, turns: float, max_rpm: float, accel_rpm_s: float) -> tuple[int, float, float]:
         """
-        Mouvement en tours (turns peut être négatif).
-        max_rpm: vitesse max
-        accel_rpm_s: accélération en rpm/s (douce => couple)
+        Conversion tours/rpm -> (steps signés, steps/s, steps/s²).
         """
         steps = int(round(turns * self.cfg.microsteps_per_rev))
 
@@ -83,4 +90,13 @@ class MotorAxis:
         # rpm/s -> steps/s²
         accel_steps_s2 = (accel_rpm_s * self.cfg.microsteps_per_rev) / 60.0
 
-        self.move_steps(steps=steps, max_steps_s=max_steps_s, accel_steps_s2=accel_steps_s2)
\ No newline at end of file
+        return steps, max_steps_s, accel_steps_s2
+
+    def move_turns(self, turns: float, max_rpm: float, accel_rpm_s: float) -> None:
+        """
+        Mouvement en tours (turns peut être négatif).
+        max_rpm: vitesse max
+        accel_rpm_s: accélération en rpm/s (douce => couple)
+        """
+        steps, max_steps_s, accel_steps_s2 = self.turns_to_motion(turns, max_rpm, accel_rpm_s)
+        self.move_steps(steps=steps, max_steps_s=max_steps_s, accel_steps_s2=accel_steps_s2)
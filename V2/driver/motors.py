@@ -1,6 +1,7 @@
 # driver/motors.py
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
 from typing import Dict, List
 
@@ -67,22 +68,41 @@ class Motors:
         """
         targets = motors or list(self.axes.keys())
 
-        # 1) enable + dir sur tous (I2C), puis 2) pulses sur tous (GPIO)
-        # On évite de lancer des pulses avant que tous aient DIR/ENA configurés.
+        # mouvement nul (arrondi au micro-pas): moteur laissé tel quel, ENA non activé
+        moves = []
         for mid in targets:
             ax = self.axes[mid]
-            ax.enable()
+            steps, max_steps_s, accel_steps_s2 = ax.turns_to_motion(turns, max_rpm, accel_rpm_s)
+            if steps != 0:
+                moves.append((ax, abs(steps), max_steps_s, accel_steps_s2))
+        if not moves:
+            return
+
+        # 1) enable + dir sur tous (I2C), puis 2) pulses sur tous (GPIO)
+        # On évite de lancer des pulses avant que tous aient DIR/ENA configurés.
+        # ENA et DIR de tout le groupe: 1 seule transaction I2C (OLATA+OLATB).
+        motor_mask = 0
+        invert_mask = 0
+        for ax, *_ in moves:
+            bit = 1 << (ax.cfg.index - 1)
+            motor_mask |= bit
+            if ax.cfg.invert_dir:
+                invert_mask |= bit
 
         # dir (0/1) dépend du signe des tours
         direction = 1 if turns > 0 else 0
-        for mid in targets:
-            ax = self.axes[mid]
-            ax.set_dir(direction)
+        ena_changed, dir_changed = self.mcp.motor_set_group(motor_mask, True, direction, invert_mask=invert_mask)
+
+        # une seule attente pour tout le groupe (ENA settle couvre aussi DIR setup),
+        # et seulement si une sortie a réellement changé
+        if ena_changed:
+            time.sleep(self.cfg.ena_settle_ms / 1000.0)
+        elif dir_changed:
+            time.sleep(self.cfg.dir_setup_us / 1_000_000.0)
 
         # lancement pulses
-        for mid in targets:
-            ax = self.axes[mid]
-            ax.move_turns(turns=turns, max_rpm=max_rpm, accel_rpm_s=accel_rpm_s)
+        for ax, nsteps, max_steps_s, accel_steps_s2 in moves:
+            ax.start_steps(nsteps, max_steps_s, accel_steps_s2)
 
     def open_all(self, turns: float = 10.0, max_rpm: float = 50.0, accel_rpm_s: float = 100.0) -> None:
         self.move_all_turns(turns=abs(turns), max_rpm=max_rpm, accel_rpm_s=accel_rpm_s)
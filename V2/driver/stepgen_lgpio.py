@@ -1,13 +1,50 @@
 # driver/stepgen_lgpio.py
 from __future__ import annotations
 
+import heapq
+import itertools
+import logging
 import threading
 import time
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
 from hal.gpio_lgpio import GpioLgpio
 
+# NumPy optionnel: calcul vectorisé de la rampe (sinon boucle Python équivalente)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Attente hybride: sleep pour le gros de l'attente, spin seulement sur la fin.
+_SPIN_THRESHOLD_NS = 200_000   # en dessous: spin pur
+_SPIN_TAIL_NS = 150_000        # marge gardée en spin après le sleep (jitter scheduler)
+
+
+def _wait_until(target_ns: int) -> None:
+    """
+    Attend jusqu'à time.monotonic_ns() >= target_ns.
+    Libère le CPU (et le GIL) pour les autres threads moteurs sur les longues périodes.
+    """
+    rem = target_ns - time.monotonic_ns()
+    if rem > _SPIN_THRESHOLD_NS:
+        time.sleep((rem - _SPIN_TAIL_NS) / 1e9)
+    while time.monotonic_ns() < target_ns:
+        pass
+
+
+# Mode hardware (lgpio.tx_pulse): rampe accel/decel découpée en paliers constants.
+# Un palier couvre au plus 1/_TX_RAMP_CHUNKS de la plage de vitesse de la rampe,
+# et au plus _TX_RAMP_MAX_RATIO x la vitesse de son premier pas (bas régime).
+_TX_RAMP_CHUNKS = 32
+_TX_RAMP_MAX_RATIO = 1.2
+# Période de scrutation de la file tx_pulse par le scheduler
+_TX_POLL_NS = 5_000_000
+
+log = logging.getLogger("machine")
+
 
 @dataclass(frozen=True)
 class StepTiming:
@@ -21,39 +58,65 @@ class MotionProfile:
     accel_steps_s2: float
 
 
+class _Move:
+    """
+    Mouvement en cours d'un moteur (état porté par le scheduler unique).
+    schedule: périodes ns (mode logiciel) ou paliers (period_ns, nb_pas) (mode tx_pulse).
+    """
+    __slots__ = ("motor_id", "bcm", "schedule", "index", "cancelled", "done")
+
+    def __init__(self, motor_id: str, bcm: int, schedule: list):
+        self.motor_id = motor_id
+        self.bcm = bcm
+        self.schedule = schedule
+        self.index = 0
+        self.cancelled = False
+        self.done = threading.Event()
+
+
 class StepGenLgpio:
     """
     Générateur de pulses STEP.
-    - Utilise lgpio pour toggler les GPIO STEP.
-    - Timing basé sur time.monotonic_ns() (busy-wait léger).
+    - Un seul thread scheduler pour tous les moteurs: tas (heapq) des prochaines
+      échéances (deadline_ns, moteur). move_steps() ne fait qu'ajouter le mouvement au tas.
+    - Par défaut: trains d'impulsions lgpio (tx_pulse), générés en C par lgpio.
+      Rampe accel/decel découpée en paliers constants de vitesse proche.
+      Le scheduler ne fait que remplir la file et surveiller la fin (aucun busy-wait).
+    - Fallback (lgpio sans tx_pulse ou hw_pulses=False): toggle GPIO depuis Python,
+      timing basé sur time.monotonic_ns() (sleep + busy-wait court avant chaque échéance).
     - Aucun I2C ici.
 
     Limitation: pas de synchronisation fine inter-moteurs, mais démarrage quasi simultané possible.
     """
 
-    def __init__(self, gpio: GpioLgpio, step_pins: Dict[str, int], timing: StepTiming):
+    def __init__(self, gpio: GpioLgpio, step_pins: Dict[str, int], timing: StepTiming, hw_pulses: bool = True):
         self.gpio = gpio
         self.step_pins = step_pins
         self.timing = timing
+        self.hw_pulses = bool(hw_pulses) and gpio.supports_tx_pulse()
+        self._high_ns = int(timing.pulse_high_us * 1000)
 
-        self._threads: Dict[str, threading.Thread] = {}
-        self._stop_flags: Dict[str, threading.Event] = {}
+        self._moves: Dict[str, _Move] = {}
+        self._heap: List[Tuple[int, int, _Move]] = []
+        self._seq = itertools.count()  # départage des échéances égales
+        self._cv = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
 
         for mid, bcm in self.step_pins.items():
             self.gpio.claim_output(bcm, initial=0)
 
     def is_busy(self, motor_id: str) -> bool:
-        t = self._threads.get(motor_id)
-        return bool(t and t.is_alive())
+        mv = self._moves.get(motor_id)
+        return bool(mv and not mv.done.is_set())
 
     def stop(self, motor_id: str) -> None:
-        ev = self._stop_flags.get(motor_id)
-        if ev:
-            ev.set()
+        mv = self._moves.get(motor_id)
+        if mv:
+            mv.cancelled = True
 
     def stop_all(self) -> None:
-        for ev in self._stop_flags.values():
-            ev.set()
+        for mv in list(self._moves.values()):
+            mv.cancelled = True
 
     def move_steps(self, motor_id: str, steps: int, profile: MotionProfile) -> None:
         """
@@ -65,36 +128,90 @@ class StepGenLgpio:
         if self.is_busy(motor_id):
             raise RuntimeError(f"Moteur {motor_id} déjà en mouvement")
 
-        stop_ev = threading.Event()
-        self._stop_flags[motor_id] = stop_ev
+        # Profil calculé ici (thread appelant): erreur remontée à l'appelant,
+        # et le scheduler n'a plus aucun calcul à faire.
+        if self.hw_pulses:
+            schedule = self._pulse_segments(steps, profile)
+        else:
+            schedule = self._period_schedule(steps, profile)
+
+        mv = _Move(motor_id, self.step_pins[motor_id], schedule)
+        self._moves[motor_id] = mv
 
-        th = threading.Thread(
-            target=self._run_move,
-            name=f"stepgen-{motor_id}",
-            args=(motor_id, steps, profile, stop_ev),
-            daemon=True,
-        )
-        self._threads[motor_id] = th
-        th.start()
+        with self._cv:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._sched_loop, name="stepgen", daemon=True)
+                self._thread.start()
+            heapq.heappush(self._heap, (time.monotonic_ns(), next(self._seq), mv))
+            self._cv.notify()
 
     def wait(self, motor_id: str, timeout_s: Optional[float] = None) -> bool:
-        t = self._threads.get(motor_id)
-        if not t:
+        mv = self._moves.get(motor_id)
+        if not mv:
             return True
-        t.join(timeout=timeout_s)
-        return not t.is_alive()
+        return mv.done.wait(timeout=timeout_s)
 
     def wait_all(self, timeout_s: Optional[float] = None) -> bool:
         ok = True
-        for mid in list(self._threads.keys()):
+        for mid in list(self._moves.keys()):
             ok = self.wait(mid, timeout_s=timeout_s) and ok
         return ok
 
     # -------------------- interne --------------------
 
-    def _run_move(self, motor_id: str, total_steps: int, profile: MotionProfile, stop_ev: threading.Event) -> None:
-        bcm = self.step_pins[motor_id]
+    def _period_schedule(self, total_steps: int, profile: MotionProfile) -> List[int]:
+        """
+        Table des périodes STEP (ns), une par pas: accel / plateau / decel.
+        Précalculée avant le mouvement pour que la boucle temps réel ne fasse
+        plus aucun calcul flottant.
+        """
+        accel, cruise_ns, cruise_steps = self._profile_parts(total_steps, profile)
+
+        # Decel (symétrique)
+        return accel + [cruise_ns] * cruise_steps + accel[::-1]
 
+    def _pulse_segments(self, total_steps: int, profile: MotionProfile) -> List[Tuple[int, int]]:
+        """
+        Profil en paliers constants [(period_ns, nb_pas), ...] pour tx_pulse.
+        Un palier regroupe les pas consécutifs de la rampe dont la vitesse reste dans une
+        bande étroite (_TX_RAMP_CHUNKS / _TX_RAMP_MAX_RATIO) et prend leur période moyenne:
+        la durée de chaque palier est conservée, et l'écart de vitesse entre deux paliers
+        voisins reste de l'ordre de celui de la rampe pas à pas (accélération bornée).
+        Le nombre total de pas est conservé exactement.
+        """
+        accel, cruise_ns, cruise_steps = self._profile_parts(total_steps, profile)
+
+        ramp: List[Tuple[int, int]] = []
+        if accel:
+            dv = (1e9 / accel[-1] - 1e9 / accel[0]) / _TX_RAMP_CHUNKS
+            start = 0
+            limit_ns = 0
+            for i, period_ns in enumerate(accel):
+                if period_ns < limit_ns:
+                    part = accel[start:i]
+                    ramp.append(((sum(part) + len(part) // 2) // len(part), len(part)))
+                    start = i
+                if start == i:
+                    # période minimale admise dans ce palier (bande de vitesse)
+                    limit_ns = max(period_ns / _TX_RAMP_MAX_RATIO, 1e9 / (1e9 / period_ns + dv))
+            part = accel[start:]
+            ramp.append(((sum(part) + len(part) // 2) // len(part), len(part)))
+
+        segments: List[Tuple[int, int]] = []
+        for period_ns, count in ramp + [(cruise_ns, cruise_steps)] + ramp[::-1]:
+            if count <= 0:
+                continue
+            # fusion des paliers identiques (ex: rampe saturée à vmax)
+            if segments and segments[-1][0] == period_ns:
+                segments[-1] = (period_ns, segments[-1][1] + count)
+            else:
+                segments.append((period_ns, count))
+        return segments
+
+    def _profile_parts(self, total_steps: int, profile: MotionProfile) -> Tuple[List[int], int, int]:
+        """
+        Retourne (périodes accel ns, période plateau ns, nb pas plateau).
+        """
         # Trapezoïde simple: accel / plateau / decel.
         vmax = float(profile.max_steps_s)
         a = float(profile.accel_steps_s2)
@@ -110,69 +227,132 @@ class StepGenLgpio:
         # si move trop court, profil triangulaire
         if 2 * accel_steps > total_steps:
             accel_steps = total_steps // 2
-            cruise_steps = total_steps - 2 * accel_steps
-        else:
-            cruise_steps = total_steps - 2 * accel_steps
+        cruise_steps = total_steps - 2 * accel_steps
 
         # bornes timing
-        high_ns = int(self.timing.pulse_high_us * 1000)
-        low_ns = int(self.timing.pulse_low_us * 1000)
-        min_period_ns = high_ns + low_ns
-
-        def busy_wait_until(target_ns: int) -> None:
-            while time.monotonic_ns() < target_ns:
-                pass
-
-        step_done = 0
+        min_period_ns = int(self.timing.pulse_high_us * 1000) + int(self.timing.pulse_low_us * 1000)
 
         # Accel: on augmente la vitesse => on réduit la période
         # On calcule une vitesse cible par pas (linéaire en steps) pour rester simple.
-        for i in range(accel_steps):
-            if stop_ev.is_set():
-                return
-            # v = sqrt(2 a s)
-            s = i + 1
-            v = (2.0 * a * s) ** 0.5
-            if v > vmax:
-                v = vmax
-            period_ns = int(1e9 / v)
-            if period_ns < min_period_ns:
-                period_ns = min_period_ns
-            self._one_pulse(bcm, high_ns, low_ns, period_ns, busy_wait_until)
-            step_done += 1
+        accel = self._accel_periods(accel_steps, a, vmax, min_period_ns)
 
         # Cruise
-        if cruise_steps > 0:
-            period_ns = int(1e9 / vmax)
-            if period_ns < min_period_ns:
-                period_ns = min_period_ns
-            for _ in range(cruise_steps):
-                if stop_ev.is_set():
-                    return
-                self._one_pulse(bcm, high_ns, low_ns, period_ns, busy_wait_until)
-                step_done += 1
+        cruise_ns = int(1e9 / vmax)
+        if cruise_ns < min_period_ns:
+            cruise_ns = min_period_ns
 
-        # Decel (symétrique)
-        for i in range(accel_steps, 0, -1):
-            if stop_ev.is_set():
-                return
-            s = i
+        return accel, cruise_ns, cruise_steps
+
+    @staticmethod
+    def _accel_periods(accel_steps: int, a: float, vmax: float, min_period_ns: int) -> List[int]:
+        """
+        Périodes (ns) de la rampe d'accélération: v = min(sqrt(2 a s), vmax), s = 1..accel_steps.
+        """
+        if accel_steps <= 0:
+            return []
+
+        if np is not None:
+            s = np.arange(1, accel_steps + 1, dtype=np.float64)
+            v = np.minimum(np.sqrt(2.0 * a * s), vmax)
+            periods = np.maximum((1e9 / v).astype(np.int64), min_period_ns)
+            # tolist(): ints Python natifs, plus rapides à itérer qu'un ndarray
+            return periods.tolist()
+
+        accel: List[int] = []
+        for s in range(1, accel_steps + 1):
+            # v = sqrt(2 a s)
             v = (2.0 * a * s) ** 0.5
             if v > vmax:
                 v = vmax
             period_ns = int(1e9 / v)
             if period_ns < min_period_ns:
                 period_ns = min_period_ns
-            self._one_pulse(bcm, high_ns, low_ns, period_ns, busy_wait_until)
-            step_done += 1
+            accel.append(period_ns)
+        return accel
+
+    def _sched_loop(self) -> None:
+        """
+        Thread scheduler unique: dépile l'échéance la plus proche, exécute l'action
+        du moteur concerné, ré-empile sa prochaine échéance.
+        Attente longue sur la Condition (réveil si un mouvement plus urgent arrive),
+        spin court (_wait_until) pour la fin.
+        """
+        heap = self._heap
+        cv = self._cv
+        step = self._step_tx if self.hw_pulses else self._step_sw
+
+        while True:
+            with cv:
+                while True:
+                    if not heap:
+                        cv.wait()
+                        continue
+                    rem = heap[0][0] - time.monotonic_ns()
+                    if rem <= _SPIN_THRESHOLD_NS:
+                        break
+                    cv.wait((rem - _SPIN_TAIL_NS) / 1e9)
+                deadline, _, mv = heapq.heappop(heap)
+
+            _wait_until(deadline)
+
+            try:
+                nxt = None if mv.cancelled else step(mv, deadline)
+            except Exception:
+                log.exception("stepgen: erreur moteur %s, mouvement interrompu", mv.motor_id)
+                mv.cancelled = True
+                nxt = None
+
+            if nxt is None:
+                self._finish(mv)
+            else:
+                with cv:
+                    heapq.heappush(heap, (nxt, next(self._seq), mv))
+
+    def _finish(self, mv: _Move) -> None:
+        try:
+            if mv.cancelled and self.hw_pulses:
+                # coupe le train en cours + vide la file
+                self.gpio.tx_pulse(mv.bcm, 0, 0)
+        finally:
+            mv.done.set()
+
+    def _step_sw(self, mv: _Move, deadline: int) -> Optional[int]:
+        """
+        Mode logiciel: une impulsion STEP à l'échéance, retourne l'échéance suivante.
+        La dernière échéance (fin de la dernière période) termine le mouvement.
+        """
+        i = mv.index
+        if i >= len(mv.schedule):
+            return None
+        mv.index = i + 1
 
-    def _one_pulse(self, bcm: int, high_ns: int, low_ns: int, period_ns: int, busy_wait_until) -> None:
-        t0 = time.monotonic_ns()
+        write = self.gpio.write
+        bcm = mv.bcm
         # HIGH
-        self.gpio.write(bcm, 1)
-        busy_wait_until(t0 + high_ns)
-        # LOW
-        self.gpio.write(bcm, 0)
-        busy_wait_until(t0 + high_ns + low_ns)
+        write(bcm, 1)
+        _wait_until(deadline + self._high_ns)
+        # LOW (pulse_low_us garanti: période >= high + low)
+        write(bcm, 0)
         # fin de période
-        busy_wait_until(t0 + period_ns)
+        return deadline + mv.schedule[i]
+
+    def _step_tx(self, mv: _Move, deadline: int) -> Optional[int]:
+        """
+        Mode tx_pulse: remplit la file lgpio avec les paliers restants,
+        puis surveille la fin du dernier palier.
+        """
+        gpio = self.gpio
+        bcm = mv.bcm
+        on_us = int(self.timing.pulse_high_us)
+        min_off_us = int(self.timing.pulse_low_us)
+
+        segments = mv.schedule
+        while mv.index < len(segments) and gpio.tx_room(bcm) > 0:
+            period_ns, count = segments[mv.index]
+            off_us = max(int(round(period_ns / 1000.0)) - on_us, min_off_us)
+            gpio.tx_pulse(bcm, on_us, off_us, pulse_cycles=count)
+            mv.index += 1
+
+        if mv.index >= len(segments) and not gpio.tx_busy(bcm):
+            return None
+        return deadline + _TX_POLL_NS
@@ -1,6 +1,8 @@
 # hal/gpio_lgpio.py
 from __future__ import annotations
 
+import functools
+
 import lgpio
 
 
@@ -14,6 +16,13 @@ class GpioLgpio:
         self.chip = chip
         self.h = lgpio.gpiochip_open(chip)
 
+        # write(bcm, level): lgpio.gpio_write pré-lié au handle (chemin STEP,
+        # aucun lookup d'attribut ni int() par front). level doit être 0/1.
+        # Pas de raccourci os.write() sur un fd de ligne /dev/gpiochip: le noyau
+        # n'accepte pas write() sur ces fd (valeurs via ioctl uniquement) et la
+        # ligne est déjà réservée par lgpio (EBUSY). Chemin STEP rapide: tx_pulse.
+        self.write = functools.partial(lgpio.gpio_write, self.h)
+
     def close(self) -> None:
         try:
             lgpio.gpiochip_close(self.h)
@@ -26,8 +35,26 @@ class GpioLgpio:
     def claim_input(self, bcm: int) -> None:
         lgpio.gpio_claim_input(self.h, bcm)
 
-    def write(self, bcm: int, level: int) -> None:
-        lgpio.gpio_write(self.h, bcm, int(level))
-
     def read(self, bcm: int) -> int:
         return int(lgpio.gpio_read(self.h, bcm))
+
+    # ---------- trains d'impulsions (tx_pulse, timing géré par lgpio) ----------
+
+    @staticmethod
+    def supports_tx_pulse() -> bool:
+        return hasattr(lgpio, "tx_pulse") and hasattr(lgpio, "tx_busy") and hasattr(lgpio, "tx_room")
+
+    def tx_pulse(self, bcm: int, pulse_on_us: int, pulse_off_us: int,
+                 pulse_offset_us: int = 0, pulse_cycles: int = 0) -> int:
+        """
+        Met en file un train d'impulsions (pulse_cycles=0 => infini, on=off=0 => arrêt).
+        Retourne la place restante dans la file.
+        """
+        return int(lgpio.tx_pulse(self.h, bcm, int(pulse_on_us), int(pulse_off_us),
+                                  int(pulse_offset_us), int(pulse_cycles)))
+
+    def tx_busy(self, bcm: int) -> bool:
+        return bool(lgpio.tx_busy(self.h, bcm, lgpio.TX_PWM))
+
+    def tx_room(self, bcm: int) -> int:
+        return int(lgpio.tx_room(self.h, bcm, lgpio.TX_PWM))
@@ -1,19 +1,32 @@
 # hal/i2c_bus.py
 from __future__ import annotations
 
+import errno
 import time
 from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
+
 from smbus2 import SMBus
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class I2CConfig:
     bus: int = 1
     retries: int = 3
     retry_delay_s: float = 0.01  # 10 ms
 
 
+# errno transitoires (NACK, bus occupé, timeout): seuls ceux-là sont réessayés
+_RETRY_ERRNOS = frozenset({errno.EIO, errno.EREMOTEIO, errno.ETIMEDOUT, errno.EAGAIN, errno.EBUSY})
+
+
 class I2CBus:
+    """
+    Accès SMBus avec retries.
+    Chemin rapide: un seul appel dans un try (aucun coût si succès).
+    Chemin lent (_retry): seulement après un échec, et seulement pour les errno transitoires.
+    """
+
     def __init__(self, cfg: I2CConfig):
         self.cfg = cfg
         self.bus = SMBus(cfg.bus)
@@ -25,44 +38,81 @@ class I2CBus:
             pass
 
     def read_byte_data(self, addr: int, reg: int) -> int:
-        last_exc = None
-        for _ in range(self.cfg.retries):
-            try:
-                return self.bus.read_byte_data(addr, reg)
-            except OSError as e:
-                last_exc = e
-                time.sleep(self.cfg.retry_delay_s)
-        raise OSError(f"I2C read_byte_data échoué addr=0x{addr:02X} reg=0x{reg:02X}") from last_exc
+        try:
+            return self.bus.read_byte_data(addr, reg)
+        except OSError as e:
+            return self._retry(e, "read_byte_data", addr, reg, self.bus.read_byte_data, addr, reg)
+
+    def read_i2c_block_data(self, addr: int, reg: int, length: int) -> list[int]:
+        """
+        Lit plusieurs registres consécutifs en une transaction (auto-incrément côté device).
+        """
+        try:
+            return self.bus.read_i2c_block_data(addr, reg, length)
+        except OSError as e:
+            return self._retry(e, "read_i2c_block_data", addr, reg, self.bus.read_i2c_block_data, addr, reg, length)
 
     def write_byte_data(self, addr: int, reg: int, value: int) -> None:
-        last_exc = None
-        for _ in range(self.cfg.retries):
-            try:
-                self.bus.write_byte_data(addr, reg, value & 0xFF)
-                return
-            except OSError as e:
-                last_exc = e
-                time.sleep(self.cfg.retry_delay_s)
-        raise OSError(f"I2C write_byte_data échoué addr=0x{addr:02X} reg=0x{reg:02X}") from last_exc
+        try:
+            self.bus.write_byte_data(addr, reg, value & 0xFF)
+        except OSError as e:
+            self._retry(e, "write_byte_data", addr, reg, self.bus.write_byte_data, addr, reg, value & 0xFF)
+
+    def write_i2c_block_data(self, addr: int, reg: int, data: list[int]) -> None:
+        """
+        Écrit plusieurs registres consécutifs en une transaction (auto-incrément côté device).
+        """
+        payload = [b & 0xFF for b in data]
+        try:
+            self.bus.write_i2c_block_data(addr, reg, payload)
+        except OSError as e:
+            self._retry(e, "write_i2c_block_data", addr, reg, self.bus.write_i2c_block_data, addr, reg, payload)
 
     def write_quick(self, addr: int) -> None:
-        last_exc = None
-        for _ in range(self.cfg.retries):
+        try:
+            self.bus.write_quick(addr)
+        except OSError as e:
+            self._retry(e, "write_quick", addr, None, self.bus.write_quick, addr)
+
+    def probe(self, addr: int) -> bool:
+        """
+        Un seul write_quick, sans retry ni sleep: True si le device répond (ACK).
+        """
+        try:
+            self.bus.write_quick(addr)
+            return True
+        except OSError:
+            return False
+
+    def _retry(self, exc: OSError, what: str, addr: int, reg: Optional[int], fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Réessaie fn(*args) jusqu'à cfg.retries tentatives au total (la première a déjà échoué).
+        Erreur non transitoire (errno hors _RETRY_ERRNOS): échec immédiat, sans sleep.
+        """
+        last_exc = exc
+        for _ in range(self.cfg.retries - 1):
+            if last_exc.errno is not None and last_exc.errno not in _RETRY_ERRNOS:
+                break
+            time.sleep(self.cfg.retry_delay_s)
             try:
-                self.bus.write_quick(addr)
-                return
+                return fn(*args)
             except OSError as e:
                 last_exc = e
-                time.sleep(self.cfg.retry_delay_s)
-        raise OSError(f"I2C write_quick échoué addr=0x{addr:02X}") from last_exc
+        where = f"addr=0x{addr:02X}" if reg is None else f"addr=0x{addr:02X} reg=0x{reg:02X}"
+        raise OSError(f"I2C {what} échoué {where}") from last_exc
 
 
-def scan_i2c(bus: I2CBus) -> list[int]:
+def scan_i2c(bus: I2CBus, expected: Optional[Iterable[int]] = None, tries: int = 1) -> list[int]:
+    """
+    Détection des devices I2C (probe sans retry, au plus `tries` essais par adresse).
+      - expected=None: balaye 0x03..0x77
+      - expected=[...]: ne teste que ces adresses (boot: quelques ms au lieu de secondes)
+    """
+    addrs = range(0x03, 0x78) if expected is None else sorted(set(expected))
     found: list[int] = []
-    for addr in range(0x03, 0x78):
-        try:
-            bus.write_quick(addr)
-            found.append(addr)
-        except OSError:
-            pass
+    for addr in addrs:
+        for _ in range(max(1, tries)):
+            if bus.probe(addr):
+                found.append(addr)
+                break
     return found
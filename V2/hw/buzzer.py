@@ -1,6 +1,7 @@
 # hw/buzzer.py
 from __future__ import annotations
 
+import queue
 import time
 import threading
 from dataclasses import dataclass
@@ -9,7 +10,7 @@ from typing import Optional, List, Tuple
 import lgpio
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class BuzzerConfig:
     gpio_bcm: int = 26
     chip: int = 0
@@ -27,38 +28,61 @@ class Buzzer:
 
         lgpio.gpio_claim_output(self.h, int(cfg.gpio_bcm), self._off_level)
 
+        # PWM lgpio (timing géré en C) si dispo, sinon toggle Python
+        self._has_pwm = hasattr(lgpio, "tx_pwm")
+
         self._lock = threading.RLock()
         self._stop = threading.Event()
         self._thread: Optional[threading.Thread] = None
+        # file des bips (duration_s, freq_hz, pause_s) consommée par _worker; None = arrêt
+        self._q: "queue.Queue[Optional[Tuple[float, float, float]]]" = queue.Queue()
 
     def beep(self, duration_s: float = 0.12, freq_hz: float = 2000.0) -> None:
         """
         Bip bloquant (simple, fiable).
+        Signal carré 50% via lgpio.tx_pwm: un seul sleep côté Python.
         """
         duration_s = float(duration_s)
         freq_hz = float(freq_hz)
         if duration_s <= 0 or freq_hz <= 0:
             return
 
-        half_period = 0.5 / freq_hz
-        t_end = time.monotonic() + duration_s
-
         with self._lock:
-            while time.monotonic() < t_end:
-                lgpio.gpio_write(self.h, self.cfg.gpio_bcm, self._on_level)
-                time.sleep(half_period)
-                lgpio.gpio_write(self.h, self.cfg.gpio_bcm, self._off_level)
-                time.sleep(half_period)
-
-            lgpio.gpio_write(self.h, self.cfg.gpio_bcm, self._off_level)
+            if self._has_pwm:
+                lgpio.tx_pwm(self.h, self.cfg.gpio_bcm, freq_hz, 50.0)
+                try:
+                    time.sleep(duration_s)
+                finally:
+                    lgpio.tx_pwm(self.h, self.cfg.gpio_bcm, 0, 0)
+                    lgpio.gpio_write(self.h, self.cfg.gpio_bcm, self._off_level)
+                return
+
+            # fallback toggle: tout en variables locales, aucun accès attribut dans la boucle
+            h, pin = self.h, self.cfg.gpio_bcm
+            on, off = self._on_level, self._off_level
+            write, sleep, now = lgpio.gpio_write, time.sleep, time.monotonic
+            half_period = 0.5 / freq_hz
+            t_end = now() + duration_s
+            while now() < t_end:
+                write(h, pin, on)
+                sleep(half_period)
+                write(h, pin, off)
+                sleep(half_period)
+
+            write(h, pin, off)
 
     def pattern(self, seq: List[Tuple[float, float]], pause_s: float = 0.05) -> None:
         """
         seq = [(duration_s, freq_hz), ...]
+        Non bloquant: la séquence est jouée par le thread buzzer (voir wait()).
         """
+        self._ensure_worker()
         for d, f in seq:
-            self.beep(d, f)
-            time.sleep(pause_s)
+            self._q.put((float(d), float(f), float(pause_s)))
+
+    def wait(self) -> None:
+        """Bloque jusqu'à la fin des séquences en file."""
+        self._q.join()
 
     def off(self) -> None:
         with self._lock:
@@ -66,6 +90,7 @@ class Buzzer:
 
     def cleanup(self) -> None:
         try:
+            self._stop_worker()
             self.off()
         finally:
             if self._own_handle:
@@ -73,3 +98,44 @@ class Buzzer:
                     lgpio.gpiochip_close(self.h)
                 except Exception:
                     pass
+
+    # -----------------
+    # Thread buzzer
+    # -----------------
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._worker, name="buzzer", daemon=True)
+            self._thread.start()
+
+    def _stop_worker(self) -> None:
+        th = self._thread
+        if th is None:
+            return
+        self._stop.set()
+        self._q.put(None)
+        th.join(timeout=2.0)
+        self._thread = None
+
+        # bips non joués: vidés pour ne pas bloquer wait()
+        while True:
+            try:
+                self._q.get_nowait()
+            except queue.Empty:
+                break
+            self._q.task_done()
+
+    def _worker(self) -> None:
+        while not self._stop.is_set():
+            item = self._q.get()
+            try:
+                if item is None or self._stop.is_set():
+                    continue
+                d, f, pause_s = item
+                self.beep(d, f)
+                self._stop.wait(pause_s)
+            finally:
+                self._q.task_done()
@@ -3,14 +3,19 @@ from __future__ import annotations
 
 import time
 import threading
-import queue
+from collections import deque
 from dataclasses import dataclass
-from typing import Optional, Dict, List, Tuple
+from typing import Deque, Optional, List, Tuple
 
 from hw.mcp_hub import MCPHub
 
+try:
+    import lgpio
+except ImportError:  # mode polling uniquement
+    lgpio = None
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class InputEvent:
     """
     Événements générés par Inputs.
@@ -33,6 +38,12 @@ class Inputs:
       MCP2 (sélecteurs):
         - VIC1..VIC5 sur PORT B bits 0..4 (actif bas)
         - AIR4..AIR1 sur PORT A bits 4..7 (actif bas)  (attention: ordre inversé)
+
+    Si int_gpio est donné (INTA/INTB de MCP1+MCP2 câblées sur ce GPIO BCM, open-drain):
+      le thread dort jusqu'au front INT (callback lgpio) au lieu de lire toutes les 10 ms.
+      Pendant un anti-rebond, lecture à poll_hz jusqu'à stabilisation; lecture de sécurité
+      toutes les safety_poll_s. Sans int_gpio (ou sans lgpio): polling à poll_hz.
+    Handle lgpio partageable (gpiochip_handle=...): il n'est alors jamais fermé ici.
     """
 
     def __init__(
@@ -42,21 +53,44 @@ class Inputs:
         debounce_ms: int = 30,
         active_low_buttons: bool = True,
         active_low_selectors: bool = True,
+        int_gpio: Optional[int] = None,
+        chip: int = 0,
+        safety_poll_s: float = 1.0,
+        gpiochip_handle: Optional[int] = None,
     ):
         self.mcp = mcp
+        # lecteurs pré-liés (chemin chaud de _poll_once): MCP1 GPIOB, MCP2 GPIOA+GPIOB
+        self._read_btn_port = mcp.port_reader("mcp1", "B")
+        self._read_sel_ports = mcp.ab_reader("mcp2")
         self.poll_period_s = 1.0 / max(1, poll_hz)
         self.debounce_s = debounce_ms / 1000.0
         self.active_low_buttons = active_low_buttons
         self.active_low_selectors = active_low_selectors
 
+        # octet MCP1 B -> (PRG1..PRG6) "pressé" 0/1, polarité incluse (256 entrées)
+        self._btn_table: List[Tuple[int, ...]] = [
+            tuple(self._apply_active_low((v >> bit) & 1, active_low_buttons) for bit in range(6))
+            for v in range(256)
+        ]
+        self.int_gpio = int_gpio
+        self.chip = chip
+        self.safety_poll_s = safety_poll_s
+
         self._stop = threading.Event()
+        self._wake = threading.Event()  # levé par le callback INT
+        self._own_handle = gpiochip_handle is None
+        self._h: Optional[int] = gpiochip_handle
+        self._cb = None
         self._th: Optional[threading.Thread] = None
-        self._q: "queue.Queue[InputEvent]" = queue.Queue()
+        # append/popleft atomiques (CPython): producteur = thread inputs, consommateur = FSM
+        # maxlen: si personne ne consomme, les plus anciens événements sont perdus
+        self._q: Deque[InputEvent] = deque(maxlen=256)
 
         # états "bruts" et "stables" pour anti-rebond
-        self._btn_raw: Dict[int, int] = {}
-        self._btn_stable: Dict[int, int] = {}
-        self._btn_last_change: Dict[int, float] = {}
+        # index 0..5 = PRG1..PRG6
+        self._btn_raw: List[int] = [0] * 6
+        self._btn_stable: List[int] = [0] * 6
+        self._btn_last_change: List[float] = [0.0] * 6
 
         # état sélecteurs (positions exclusives)
         self._vic_raw: Optional[object] = None
@@ -67,36 +101,60 @@ class Inputs:
         self._air_stable: Optional[object] = None
         self._air_last_change: float = 0.0
 
+        # état stable publié d'un bloc (lecture sans verrou par snapshot())
+        self._snap: dict = {}
+        self._publish_snapshot()
+
+        # Derniers octets bruts lus, empaquetés en un int (MCP1 B << 16 | MCP2 A << 8 | MCP2 B),
+        # et anti-rebond en cours: si octets inchangés et rien en attente, le poll s'arrête là.
+        # (Ce test suffit à rendre le cas courant quasi gratuit: une version compilée
+        # Cython/Numba de la machine d'état n'apporterait rien de mesurable ici.)
+        self._last_raw: int = -1
+        self._pending = False
+
     # ----------------------- API publique -----------------------
 
     def start(self) -> None:
         if self._th and self._th.is_alive():
             return
         self._stop.clear()
+        if self.int_gpio is not None and self._cb is None:
+            self._start_irq()
         self._th = threading.Thread(target=self._run, name="inputs", daemon=True)
         self._th.start()
 
     def stop(self) -> None:
         self._stop.set()
+        self._wake.set()
         if self._th:
             self._th.join(timeout=1.0)
 
+        try:
+            if self._cb is not None and hasattr(self._cb, "cancel"):
+                self._cb.cancel()
+        except Exception:
+            pass
+        self._cb = None
+        if self._h is not None and self._own_handle:
+            try:
+                lgpio.gpiochip_close(self._h)
+            except Exception:
+                pass
+            self._h = None
+
     def get_events(self, max_events: int = 50) -> List[InputEvent]:
         events: List[InputEvent] = []
-        for _ in range(max_events):
+        q = self._q
+        while q and len(events) < max_events:
             try:
-                events.append(self._q.get_nowait())
-            except queue.Empty:
+                events.append(q.popleft())
+            except IndexError:
                 break
         return events
 
     def snapshot(self) -> dict:
-        """État stable courant (utile pour debug/LCD)."""
-        return {
-            "buttons": {f"PRG{i}": self._btn_stable.get(i, 0) for i in range(1, 7)},
-            "vic": self._vic_stable,
-            "air": self._air_stable,
-        }
+        """État stable courant (utile pour debug/LCD). Lecture seule: ne pas modifier."""
+        return self._snap
 
     # ----------------------- interne -----------------------
 
@@ -106,24 +164,72 @@ class Inputs:
         self._init_states(now)
 
         while not self._stop.is_set():
+            # clear avant la lecture: un front INT pendant _poll_once relance un tour
+            self._wake.clear()
             t = time.monotonic()
             self._poll_once(t)
-            time.sleep(self.poll_period_s)
+            if self._cb is None:
+                self._stop.wait(self.poll_period_s)
+                continue
+            timeout = self.poll_period_s if self._pending else self.safety_poll_s
+            self._wake.wait(timeout)
+
+    def _start_irq(self) -> None:
+        """
+        Configure les interruptions MCP (changement d'état sur les entrées utilisées)
+        et un callback lgpio sur le GPIO INT (actif bas -> front descendant).
+        Le callback ne fait que réveiller le thread: pas d'I2C dans le thread lgpio.
+        """
+        if lgpio is None or not hasattr(lgpio, "callback"):
+            return  # fallback: polling
+
+        gpio = int(self.int_gpio)
+        edge = getattr(lgpio, "FALLING_EDGE", 2)
+        if self._h is None:
+            self._h = lgpio.gpiochip_open(int(self.chip))
+        if hasattr(lgpio, "gpio_claim_alert"):
+            lgpio.gpio_claim_alert(self._h, gpio, edge, getattr(lgpio, "SET_PULL_UP", 0))
+        else:
+            lgpio.gpio_claim_input(self._h, gpio)
+
+        self.mcp.enable_interrupts("mcp1", 0x00, 0x3F)  # PRG1..PRG6 = B0..B5
+        self.mcp.enable_interrupts("mcp2", 0xF0, 0x1F)  # AIR = A4..A7, VIC = B0..B4
+
+        def _cb_fn(chip, gpio, level, tick):
+            self._wake.set()
+
+        self._cb = lgpio.callback(self._h, gpio, edge, _cb_fn)
+
+    def _publish_snapshot(self) -> None:
+        # nouveau dict à chaque changement stable, publié par une seule affectation
+        self._snap = {
+            "buttons": {f"PRG{i}": v for i, v in enumerate(self._btn_stable, 1)},
+            "vic": self._vic_stable,
+            "air": self._air_stable,
+        }
+
+    def _debouncing(self) -> bool:
+        # une entrée brute diffère de l'état stable -> anti-rebond en cours
+        return (
+            self._btn_raw != self._btn_stable
+            or self._vic_raw != self._vic_stable
+            or self._air_raw != self._air_stable
+        )
 
     def _init_states(self, t: float) -> None:
         # boutons
         b = self.mcp.read_port("mcp1", "B")
-        for i in range(1, 7):
-            bit = i - 1  # B0..B5
-            raw = 1 if (b & (1 << bit)) else 0
-            pressed = self._apply_active_low(raw, self.active_low_buttons)
-            self._btn_raw[i] = pressed
-            self._btn_stable[i] = pressed
-            self._btn_last_change[i] = t
-
-        # sélecteurs
-        vic = self._read_vic_position()
-        air = self._read_air_position()
+        pressed_vec = self._btn_table[b]  # B0..B5
+        self._btn_raw = list(pressed_vec)
+        self._btn_stable = list(pressed_vec)
+        self._btn_last_change = [t] * 6
+
+        # sélecteurs (MCP2 A+B en une lecture)
+        port_a, port_b = self.mcp.read_ab("mcp2")
+        self._last_raw = (b << 16) | (port_a << 8) | port_b
+        self._pending = False
+        vic = self._read_vic_position(port_b)
+        air = self._read_air_position(port_a)
         self._vic_raw = vic
         self._vic_stable = vic
         self._vic_last_change = t
@@ -131,6 +237,7 @@ class Inputs:
         self._air_raw = air
         self._air_stable = air
         self._air_last_change = t
+        self._publish_snapshot()
 
     @staticmethod
     def _apply_active_low(level: int, active_low: bool) -> int:
@@ -141,38 +248,46 @@ class Inputs:
         return 1 if level == 1 else 0
 
     def _poll_once(self, t: float) -> None:
-        # --- boutons programmes ---
-        b = self.mcp.read_port("mcp1", "B")
-        for i in range(1, 7):
-            bit = i - 1
-            level = 1 if (b & (1 << bit)) else 0
-            pressed = self._apply_active_low(level, self.active_low_buttons)
-            self._debounce_button(i, pressed, t)
+        b = self._read_btn_port()
+        # --- sélecteurs: MCP2 A+B en une seule transaction I2C ---
+        port_a, port_b = self._read_sel_ports()
+
+        # Cas courant: rien n'a bougé et aucun anti-rebond en cours -> rien à faire
+        raw = (b << 16) | (port_a << 8) | port_b
+        if raw == self._last_raw and not self._pending:
+            return
+        self._last_raw = raw
+
+        # --- boutons programmes: seulement ceux qui bougent ou sont en anti-rebond ---
+        raw_btn = self._btn_raw
+        stable_btn = self._btn_stable
+        for idx, pressed in enumerate(self._btn_table[b]):
+            if pressed != raw_btn[idx] or pressed != stable_btn[idx]:
+                self._debounce_button(idx, pressed, t)
 
         # --- VIC ---
-        vic = self._read_vic_position()
+        vic = self._read_vic_position(port_b)
         self._debounce_selector("vic", vic, t)
 
         # --- AIR ---
-        air = self._read_air_position()
+        air = self._read_air_position(port_a)
         self._debounce_selector("air", air, t)
 
-    def _debounce_button(self, prog_index: int, pressed: int, t: float) -> None:
-        raw_prev = self._btn_raw.get(prog_index, 0)
-        if pressed != raw_prev:
-            self._btn_raw[prog_index] = pressed
-            self._btn_last_change[prog_index] = t
+        self._pending = self._debouncing()
 
-        stable = self._btn_stable.get(prog_index, 0)
-        last_change = self._btn_last_change.get(prog_index, t)
+    def _debounce_button(self, idx: int, pressed: int, t: float) -> None:
+        # idx: 0..5 (PRG1..PRG6)
+        if pressed != self._btn_raw[idx]:
+            self._btn_raw[idx] = pressed
+            self._btn_last_change[idx] = t
 
-        if (t - last_change) >= self.debounce_s and stable != self._btn_raw[prog_index]:
-            new_stable = self._btn_raw[prog_index]
-            self._btn_stable[prog_index] = new_stable
+        if (t - self._btn_last_change[idx]) >= self.debounce_s and self._btn_stable[idx] != pressed:
+            self._btn_stable[idx] = pressed
+            self._publish_snapshot()
 
             # événement sur front montant (pression)
-            if new_stable == 1:
-                self._q.put(InputEvent("btn_prog_pressed", prog_index, t))
+            if pressed == 1:
+                self._q.append(InputEvent("btn_prog_pressed", idx + 1, t))
 
     def _debounce_selector(self, which: str, position: object, t: float) -> None:
         if which == "vic":
@@ -183,7 +298,8 @@ class Inputs:
 
             if (t - self._vic_last_change) >= self.debounce_s and self._vic_stable != self._vic_raw:
                 self._vic_stable = self._vic_raw
-                self._q.put(InputEvent("vic_changed", self._vic_stable, t))
+                self._publish_snapshot()
+                self._q.append(InputEvent("vic_changed", self._vic_stable, t))
             return
 
         if which == "air":
@@ -194,33 +310,30 @@ class Inputs:
 
             if (t - self._air_last_change) >= self.debounce_s and self._air_stable != self._air_raw:
                 self._air_stable = self._air_raw
-                self._q.put(InputEvent("air_changed", self._air_stable, t))
+                self._publish_snapshot()
+                self._q.append(InputEvent("air_changed", self._air_stable, t))
             return
 
-    def _read_vic_position(self) -> object:
+    def _read_vic_position(self, port_b: int) -> object:
         """
+        port_b: GPIOB de MCP2.
         Retourne:
           - 1..5 si une seule position active
           - None si aucune
           - "invalid" si plusieurs actives
         """
-        port_b = self.mcp.read_port("mcp2", "B")
-        actives: List[int] = []
-        for pos in range(1, 6):  # VIC1..VIC5 = B0..B4
-            bit = pos - 1
-            level = 1 if (port_b & (1 << bit)) else 0
-            active = self._apply_active_low(level, self.active_low_selectors)
-            if active:
-                actives.append(pos)
-
-        if len(actives) == 0:
+        # VIC1..VIC5 = B0..B4 -> bits actifs, puis décodage "un seul bit"
+        bits = (~port_b if self.active_low_selectors else port_b) & 0x1F
+        n = bits.bit_count()
+        if n == 0:
             return None
-        if len(actives) == 1:
-            return actives[0]
+        if n == 1:
+            return bits.bit_length()  # B0 -> 1 ... B4 -> 5
         return "invalid"
 
-    def _read_air_position(self) -> object:
+    def _read_air_position(self, port_a: int) -> object:
         """
+        port_a: GPIOA de MCP2.
         Mapping AIR selon ton info:
           MCP2 port A bits 4..7 = AIR4..AIR1 (actif bas)
 
@@ -229,19 +342,11 @@ class Inputs:
           - None si aucune
           - "invalid" si plusieurs actives
         """
-        port_a = self.mcp.read_port("mcp2", "A")
-        actives: List[int] = []
-
-        # bit 7 -> AIR1, bit 6 -> AIR2, bit 5 -> AIR3, bit 4 -> AIR4
-        mapping: List[Tuple[int, int]] = [(7, 1), (6, 2), (5, 3), (4, 4)]
-        for bit, air_pos in mapping:
-            level = 1 if (port_a & (1 << bit)) else 0
-            active = self._apply_active_low(level, self.active_low_selectors)
-            if active:
-                actives.append(air_pos)
-
-        if len(actives) == 0:
+        bits = (~port_a if self.active_low_selectors else port_a) & 0xF0
+        n = bits.bit_count()
+        if n == 0:
             return None
-        if len(actives) == 1:
-            return actives[0]
+        if n == 1:
+            # bit 7 -> AIR1, bit 6 -> AIR2, bit 5 -> AIR3, bit 4 -> AIR4
+            return 9 - bits.bit_length()
         return "invalid"
@@ -0,0 +1,78 @@
+# hw/lcd_writer.py
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Dict, Optional
+
+log = logging.getLogger("machine")
+
+
+class LcdWriter:
+    """
+    Écritures LCD dans un thread dédié: l'appelant (tick FSM) ne bloque jamais sur l'I2C.
+
+    Boîte aux lettres par ligne (adresse DDRAM -> texte), "dernière valeur gagne":
+    si plusieurs mises à jour d'une ligne arrivent pendant une écriture lente,
+    seule la dernière part sur le bus.
+
+    Même API que LCDI2C_backpack pour la FSM: lcd_string(message, line) et LCD_LINE_1..4.
+    """
+
+    def __init__(self, lcd):
+        self.lcd = lcd
+        self.LCD_LINE_1 = lcd.LCD_LINE_1
+        self.LCD_LINE_2 = lcd.LCD_LINE_2
+        self.LCD_LINE_3 = lcd.LCD_LINE_3
+        self.LCD_LINE_4 = lcd.LCD_LINE_4
+
+        self._pending: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._th: Optional[threading.Thread] = None
+
+    # ----------------------- API publique -----------------------
+
+    def start(self) -> None:
+        if self._th and self._th.is_alive():
+            return
+        self._stop.clear()
+        self._th = threading.Thread(target=self._run, name="lcd", daemon=True)
+        self._th.start()
+
+    def stop(self) -> None:
+        """Arrête le thread après avoir écrit les lignes encore en attente."""
+        self._stop.set()
+        self._wake.set()
+        if self._th:
+            self._th.join(timeout=2.0)
+            self._th = None
+
+    def set_line(self, line: int, text: str) -> None:
+        """Non bloquant: remplace le texte en attente de la ligne (adresse LCD_LINE_x)."""
+        with self._lock:
+            self._pending[line] = text
+        self._wake.set()
+
+    def lcd_string(self, message: str, line: int) -> None:
+        self.set_line(line, message)
+
+    # ----------------------- interne -----------------------
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            # clear avant l'échange: un set_line pendant l'écriture relance un tour
+            self._wake.clear()
+            with self._lock:
+                frame, self._pending = self._pending, {}
+            for line, text in frame.items():
+                try:
+                    self.lcd.lcd_string(text, line)
+                except Exception as e:
+                    log.error("LCD: erreur écriture ligne 0x%02X: %s", line, e)
+            if self._stop.is_set():
+                with self._lock:
+                    if not self._pending:
+                        return
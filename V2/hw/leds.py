@@ -3,6 +3,9 @@ from __future__ import annotations
 
 from hw.mcp_hub import MCPHub, McpPin
 
+# LED1..LED6 = MCP1 A2..A7
+LED_MASK = 0b11111100
+
 
 class ProgramLeds:
     """
@@ -17,6 +20,11 @@ class ProgramLeds:
         self.mcp = mcp
         self.active_high = active_high
 
+        # octet LEDs (bits A2..A7) par programme, polarité incluse: index 0 = tout éteint
+        flip = 0 if active_high else LED_MASK
+        self._flip = flip
+        self._prog_bytes = tuple(((1 << (i + 1)) if i else 0) ^ flip for i in range(7))
+
     def set_prog_led(self, prog_index: int, on: bool) -> None:
         """
         prog_index: 1..6
@@ -31,14 +39,22 @@ class ProgramLeds:
             value ^= 1
         self.mcp.write_pin(pin, value)
 
+    def set_mask(self, mask: int) -> None:
+        """
+        mask: bit (i-1) = LED i (1..6), 1 = allumée.
+        Toutes les LEDs en une seule écriture du port A (aucune si l'état ne change pas).
+        """
+        value = ((mask & 0x3F) << 2) ^ self._flip
+        self.mcp.write_port_masked("mcp1", "A", LED_MASK, value)
+
     def all_off(self) -> None:
-        for i in range(1, 7):
-            self.set_prog_led(i, False)
+        self.show_active_program(None)
 
     def show_active_program(self, prog_index: int | None) -> None:
         """
         Allume uniquement la LED du programme actif.
         Si prog_index est None => tout éteint.
+        Une seule écriture du port A (aucune si l'état ne change pas).
         """
-        for i in range(1, 7):
-            self.set_prog_led(i, prog_index == i)
+        idx = prog_index if prog_index is not None and 1 <= prog_index <= 6 else 0
+        self.mcp.write_port_masked("mcp1", "A", LED_MASK, self._prog_bytes[idx])
@@ -1,8 +1,9 @@
 # hw/mcp_hub.py
 from __future__ import annotations
 
+import functools
 from dataclasses import dataclass
-from typing import Dict, Tuple
+from typing import Callable, Dict, List, Tuple
 
 from hal.i2c_bus import I2CBus
 
@@ -10,6 +11,11 @@ from hal.i2c_bus import I2CBus
 # Registres MCP23017 (BANK=0)
 IODIRA = 0x00
 IODIRB = 0x01
+GPINTENA = 0x04
+GPINTENB = 0x05
+INTCONA = 0x08
+INTCONB = 0x09
+IOCON = 0x0A
 GPPUA = 0x0C
 GPPUB = 0x0D
 GPIOA = 0x12
@@ -17,15 +23,28 @@ GPIOB = 0x13
 OLATA = 0x14
 OLATB = 0x15
 
+# IOCON: INTA/INTB reliées (MIRROR) + sortie INT open-drain (ODR) -> plusieurs MCP sur un GPIO
+IOCON_MIRROR = 0x40
+IOCON_ODR = 0x04
 
-@dataclass(frozen=True)
+# "A"/"B" (ou minuscules) -> registre, sans .upper() dans le chemin chaud
+_GPIO_REG = {"A": GPIOA, "a": GPIOA, "B": GPIOB, "b": GPIOB}
+_OLAT_REG = {"A": OLATA, "a": OLATA, "B": OLATB, "b": OLATB}
+
+
+def _reverse8(v: int) -> int:
+    """Inverse l'ordre des 8 bits (bit0 <-> bit7)."""
+    return int(f"{v & 0xFF:08b}"[::-1], 2)
+
+
+@dataclass(frozen=True, slots=True)
 class McpAddressing:
     mcp1: int = 0x24
     mcp2: int = 0x25
     mcp3: int = 0x26
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class McpPin:
     mcp: str   # "mcp1" / "mcp2" / "mcp3"
     port: str  # "A" ou "B"
@@ -45,13 +64,18 @@ class MCPHub:
     def __init__(self, bus: I2CBus, addrs: McpAddressing):
         self.bus = bus
         self.addrs = addrs
+        self._addr_map: Dict[str, int] = {"mcp1": addrs.mcp1, "mcp2": addrs.mcp2, "mcp3": addrs.mcp3}
 
         # Cache des sorties (latches) pour écrire seulement ce qui change
-        # clé: ("mcp1","A") etc -> valeur 0..255
-        self._olat: Dict[Tuple[str, str], int] = {}
+        # clé: ("mcp1", OLATA) etc -> valeur 0..255
+        self._olat: Dict[Tuple[str, int], int] = {}
+
+        # Interruptions actives (enable_interrupts): mcp -> (GPINTENA, GPINTENB).
+        # Ré-écrites par _write_config: un init_all() après Inputs._start_irq les conserve.
+        self._irq: Dict[str, Tuple[int, int]] = {}
 
     def _addr(self, mcp: str) -> int:
-        return getattr(self.addrs, mcp)
+        return self._addr_map[mcp]
 
     def init_all(self) -> None:
         """
@@ -59,58 +83,86 @@ class MCPHub:
         - MCP1 (0x24): B0..B5 entrées boutons, A2..A7 sorties LEDs (le reste: entrées pull-up)
         - MCP2 (0x25): entrées (VIC sur B, AIR sur A), pull-ups
         - MCP3 (0x26): sorties (DIR sur A, ENA sur B), ENA désactivé par défaut (1 car actif bas)
+        Peut être rappelé à tout moment (ré-init après erreur bus): les interruptions
+        déjà activées par enable_interrupts sont ré-écrites dans le même bloc.
         """
+        # (ré)init: on repart d'un cache vide pour forcer l'écriture des latches
+        self._olat.clear()
         self._init_mcp1()
         self._init_mcp2()
         self._init_mcp3()
 
     def _init_mcp1(self) -> None:
-        addr = self._addr("mcp1")
-
         # IODIR: 1=input, 0=output
         # MCP1 boutons: B0..B5 input => bits 0..5 = 1, le reste input aussi pour sécurité
         iodir_b = 0xFF
         # LEDs: A2..A7 output => bits 2..7 = 0, A0..A1 input => 1
         iodir_a = 0b00000011
 
-        self.bus.write_byte_data(addr, IODIRA, iodir_a)
-        self.bus.write_byte_data(addr, IODIRB, iodir_b)
-
         # Pull-ups sur entrées (A0..A1 + tous B)
         gppu_a = 0b00000011
         gppu_b = 0xFF
-        self.bus.write_byte_data(addr, GPPUA, gppu_a)
-        self.bus.write_byte_data(addr, GPPUB, gppu_b)
 
         # Init sorties LEDs à 0
-        self._write_olat("mcp1", "A", 0x00)
+        self._write_config("mcp1", iodir_a, iodir_b, gppu_a, gppu_b, olat_a=0x00, olat_b=0x00)
 
     def _init_mcp2(self) -> None:
-        addr = self._addr("mcp2")
-
-        # Tout en entrée (selon ton mapping: B0..B4 VIC, A4..A7 AIR)
-        self.bus.write_byte_data(addr, IODIRA, 0xFF)
-        self.bus.write_byte_data(addr, IODIRB, 0xFF)
-
-        # Pull-ups sur toutes entrées
-        self.bus.write_byte_data(addr, GPPUA, 0xFF)
-        self.bus.write_byte_data(addr, GPPUB, 0xFF)
+        # Tout en entrée (selon ton mapping: B0..B4 VIC, A4..A7 AIR), pull-ups sur toutes entrées
+        self._write_config("mcp2", 0xFF, 0xFF, 0xFF, 0xFF, olat_a=0x00, olat_b=0x00)
 
     def _init_mcp3(self) -> None:
-        addr = self._addr("mcp3")
-
-        # Tout en sortie: DIR (A), ENA (B)
-        self.bus.write_byte_data(addr, IODIRA, 0x00)
-        self.bus.write_byte_data(addr, IODIRB, 0x00)
-
-        # pas de pull-ups nécessaires sur sorties
-        self.bus.write_byte_data(addr, GPPUA, 0x00)
-        self.bus.write_byte_data(addr, GPPUB, 0x00)
-
+        # Tout en sortie: DIR (A), ENA (B); pas de pull-ups nécessaires sur sorties
         # Default: ENA désactivé (1) car actif bas -> tous à 1
-        self._write_olat("mcp3", "B", 0xFF)
         # Default DIR = 0 (peu importe au repos)
-        self._write_olat("mcp3", "A", 0x00)
+        self._write_config("mcp3", 0x00, 0x00, 0x00, 0x00, olat_a=0x00, olat_b=0xFF)
+
+    def _write_config(
+        self, mcp: str, iodir_a: int, iodir_b: int, gppu_a: int, gppu_b: int, olat_a: int, olat_b: int
+    ) -> None:
+        """
+        Configuration complète d'un MCP en UNE transaction I2C: bloc IODIRA..OLATB (0x00..0x15),
+        auto-incrément d'adresse (IOCON.BANK=0 / SEQOP=0, valeurs de mise sous tension).
+        IPOL, DEFVAL, INTCON remis à 0; GPINTEN et IOCON (MIRROR/ODR) reprennent l'état
+        posé par enable_interrupts (0 si jamais appelé), pour ne pas couper les IRQ.
+        INTF/INTCAP sont en lecture seule (octets ignorés); GPIOx écrit le latch comme OLATx.
+        Les latches (GPIO puis OLAT) suivent IODIR dans le même bloc: pas d'écriture séparée.
+        """
+        olat_a &= 0xFF
+        olat_b &= 0xFF
+        gpinten_a, gpinten_b = self._irq.get(mcp, (0x00, 0x00))
+        iocon = IOCON_MIRROR | IOCON_ODR if mcp in self._irq else 0x00
+        payload = [
+            iodir_a, iodir_b,       # 0x00 IODIRA/B
+            0x00, 0x00,             # 0x02 IPOLA/B
+            gpinten_a, gpinten_b,   # 0x04 GPINTENA/B
+            0x00, 0x00,             # 0x06 DEFVALA/B
+            0x00, 0x00,             # 0x08 INTCONA/B (changement d'état)
+            iocon, iocon,           # 0x0A IOCON (x2, même registre)
+            gppu_a, gppu_b,         # 0x0C GPPUA/B
+            0x00, 0x00,             # 0x0E INTFA/B (lecture seule)
+            0x00, 0x00,             # 0x10 INTCAPA/B (lecture seule)
+            olat_a, olat_b,         # 0x12 GPIOA/B (écrit OLAT)
+            olat_a, olat_b,         # 0x14 OLATA/B
+        ]
+        self.bus.write_i2c_block_data(self._addr_map[mcp], IODIRA, payload)
+        self._olat[(mcp, OLATA)] = olat_a
+        self._olat[(mcp, OLATB)] = olat_b
+
+    def enable_interrupts(self, mcp: str, mask_a: int, mask_b: int) -> None:
+        """
+        Active l'interruption "changement d'état" (INTCON=0) sur les bits donnés.
+        INTA/INTB en miroir, open-drain actif bas: les sorties INT de plusieurs MCP
+        peuvent être câblées ensemble sur un seul GPIO (pull-up côté Pi).
+        L'interruption est acquittée par la lecture de GPIOx (read_port / read_ab).
+        Masques mémorisés: un init_all() ultérieur les ré-applique.
+        """
+        addr = self._addr(mcp)
+        self._irq[mcp] = (mask_a & 0xFF, mask_b & 0xFF)
+        self.bus.write_byte_data(addr, IOCON, IOCON_MIRROR | IOCON_ODR)
+        self.bus.write_byte_data(addr, INTCONA, 0x00)
+        self.bus.write_byte_data(addr, INTCONB, 0x00)
+        self.bus.write_byte_data(addr, GPINTENA, mask_a & 0xFF)
+        self.bus.write_byte_data(addr, GPINTENB, mask_b & 0xFF)
 
     # ----------------------------
     # API haut niveau (sorties)
@@ -126,6 +178,13 @@ class MCPHub:
     def write_port(self, mcp: str, port: str, value: int) -> None:
         self._write_olat(mcp, port, value & 0xFF)
 
+    def write_port_masked(self, mcp: str, port: str, mask: int, value: int) -> None:
+        """
+        Écrit seulement les bits de mask (les autres gardent la valeur du latch), en un octet.
+        """
+        current = self._read_cached_olat(mcp, port)
+        self._write_olat(mcp, port, (current & ~mask) | (value & mask))
+
     # ----------------------------
     # API haut niveau (entrées)
     # ----------------------------
@@ -135,63 +194,139 @@ class MCPHub:
         return 1 if (v & (1 << pin.bit)) else 0
 
     def read_port(self, mcp: str, port: str) -> int:
-        addr = self._addr(mcp)
-        reg = GPIOA if port.upper() == "A" else GPIOB
-        return self.bus.read_byte_data(addr, reg) & 0xFF
+        return self.bus.read_byte_data(self._addr_map[mcp], _GPIO_REG[port]) & 0xFF
+
+    def read_ab(self, mcp: str) -> Tuple[int, int]:
+        """
+        GPIOA + GPIOB en une seule transaction I2C (auto-incrément, IOCON.BANK=0/SEQOP=0).
+        """
+        a, b = self.bus.read_i2c_block_data(self._addr_map[mcp], GPIOA, 2)
+        return a & 0xFF, b & 0xFF
+
+    # Lecteurs pré-liés pour les boucles de polling: adresse et registre résolus une fois,
+    # un seul appel I2CBus (retries conservés) par lecture.
+    def port_reader(self, mcp: str, port: str) -> Callable[[], int]:
+        """Équivalent de read_port(mcp, port) sans arguments à résoudre."""
+        return functools.partial(self.bus.read_byte_data, self._addr_map[mcp], _GPIO_REG[port])
+
+    def ab_reader(self, mcp: str) -> Callable[[], List[int]]:
+        """Équivalent de read_ab(mcp): retourne [GPIOA, GPIOB]."""
+        return functools.partial(self.bus.read_i2c_block_data, self._addr_map[mcp], GPIOA, 2)
 
     # ----------------------------
     # Helpers moteurs (MCP3)
     # ----------------------------
 
-    def motor_set_enable(self, motor_index: int, enabled: bool) -> None:
+    def motor_set_enable(self, motor_index: int, enabled: bool) -> bool:
         """
         motor_index: 1..8
         MCP3 ENA: B0..B7 = ENA1..ENA8
         ENA actif bas => enabled=True -> écrire 0
+        Retourne True si la sortie a changé (pas d'I2C si déjà dans l'état demandé).
         """
         if not (1 <= motor_index <= 8):
             raise ValueError("motor_index doit être 1..8")
-        bit = motor_index - 1
-        pin = McpPin("mcp3", "B", bit)
-        # actif bas
-        self.write_pin(pin, 0 if enabled else 1)
+        return self.motor_set_enable_mask(1 << (motor_index - 1), enabled) != 0
 
-    def motor_set_dir(self, motor_index: int, direction: int, invert: bool = False) -> None:
+    def motor_set_dir(self, motor_index: int, direction: int, invert: bool = False) -> bool:
         """
         direction: 0/1 logique.
         MCP3 DIR: A0..A7 = DIR8..DIR1 (selon ton info)
         Donc:
           motor 1 -> A7
           motor 8 -> A0
+        Retourne True si la sortie a changé (pas d'I2C si déjà dans l'état demandé).
         """
         if not (1 <= motor_index <= 8):
             raise ValueError("motor_index doit être 1..8")
-        direction = 1 if direction else 0
-        if invert:
-            direction ^= 1
+        bit = 1 << (motor_index - 1)
+        return self.motor_set_dir_mask(bit, direction, invert_mask=bit if invert else 0) != 0
 
-        bit = 8 - motor_index  # M1->7, M8->0
-        pin = McpPin("mcp3", "A", bit)
-        self.write_pin(pin, direction)
+    def motor_set_enable_mask(self, motor_mask: int, enabled: bool) -> int:
+        """
+        ENA de plusieurs moteurs en une seule écriture I2C (OLATB).
+        motor_mask: bit (i-1) = moteur i (1..8). Les moteurs hors masque ne changent pas.
+        ENA actif bas => enabled=True -> bits à 0
+        Retourne le masque des moteurs dont l'ENA a réellement changé (0 => aucune écriture).
+        """
+        current = self._read_cached_olat("mcp3", "B")
+        new_val = self._ena_byte(current, motor_mask, enabled)
+        changed = current ^ new_val
+        if changed:
+            self._write_olat("mcp3", "B", new_val)
+        return changed
+
+    def motor_set_dir_mask(self, motor_mask: int, direction: int, invert_mask: int = 0) -> int:
+        """
+        DIR de plusieurs moteurs en une seule écriture I2C (OLATA).
+        motor_mask / invert_mask: bit (i-1) = moteur i (1..8).
+        direction: 0/1 logique, inversée pour les moteurs de invert_mask.
+        MCP3 DIR: A0..A7 = DIR8..DIR1 => masque moteur inversé bit à bit.
+        Retourne le masque des moteurs dont DIR a réellement changé (0 => aucune écriture).
+        """
+        current = self._read_cached_olat("mcp3", "A")
+        new_val = self._dir_byte(current, motor_mask, direction, invert_mask)
+        changed = current ^ new_val
+        if changed:
+            self._write_olat("mcp3", "A", new_val)
+        return _reverse8(changed)
+
+    def motor_set_group(self, motor_mask: int, enabled: bool, direction: int, invert_mask: int = 0) -> Tuple[int, int]:
+        """
+        ENA + DIR d'un groupe de moteurs en UNE transaction I2C:
+        bloc OLATA, OLATB (auto-incrément d'adresse, IOCON.BANK=0 par défaut).
+        Retourne (masque ENA changé, masque DIR changé), bit (i-1) = moteur i.
+        Aucune écriture si rien ne change.
+        """
+        cur_a = self._read_cached_olat("mcp3", "A")
+        cur_b = self._read_cached_olat("mcp3", "B")
+        new_a = self._dir_byte(cur_a, motor_mask, direction, invert_mask)
+        new_b = self._ena_byte(cur_b, motor_mask, enabled)
+        if new_a != cur_a or new_b != cur_b:
+            self._write_olat_ab("mcp3", new_a, new_b)
+        return cur_b ^ new_b, _reverse8(cur_a ^ new_a)
+
+    @staticmethod
+    def _ena_byte(current: int, motor_mask: int, enabled: bool) -> int:
+        # ENA B0..B7 = moteur 1..8, actif bas
+        motor_mask &= 0xFF
+        return (current & ~motor_mask) & 0xFF if enabled else (current | motor_mask)
+
+    @staticmethod
+    def _dir_byte(current: int, motor_mask: int, direction: int, invert_mask: int) -> int:
+        # DIR A7..A0 = moteur 1..8 (ordre inversé)
+        motor_mask &= 0xFF
+        ones = (motor_mask & ~invert_mask) if direction else (motor_mask & invert_mask)
+        port_mask = _reverse8(motor_mask)
+        return ((current & ~port_mask) | _reverse8(ones & 0xFF)) & 0xFF
 
     # ----------------------------
     # Interne: cache OLAT
     # ----------------------------
 
     def _read_cached_olat(self, mcp: str, port: str) -> int:
-        key = (mcp, port.upper())
+        reg = _OLAT_REG[port]
+        key = (mcp, reg)
         if key in self._olat:
             return self._olat[key]
         # si pas en cache, lire OLAT (pas GPIO) pour connaître le latch
-        addr = self._addr(mcp)
-        reg = OLATA if port.upper() == "A" else OLATB
-        v = self.bus.read_byte_data(addr, reg) & 0xFF
+        v = self.bus.read_byte_data(self._addr_map[mcp], reg) & 0xFF
         self._olat[key] = v
         return v
 
     def _write_olat(self, mcp: str, port: str, value: int) -> None:
-        addr = self._addr(mcp)
-        reg = OLATA if port.upper() == "A" else OLATB
+        reg = _OLAT_REG[port]
         value &= 0xFF
-        self.bus.write_byte_data(addr, reg, value)
-        self._olat[(mcp, port.upper())] = value
+        key = (mcp, reg)
+        if self._olat.get(key) == value:
+            return  # latch déjà à cette valeur: pas de transaction I2C
+        self.bus.write_byte_data(self._addr_map[mcp], reg, value)
+        self._olat[key] = value
+
+    def _write_olat_ab(self, mcp: str, value_a: int, value_b: int) -> None:
+        """OLATA puis OLATB en une seule transaction (bloc de 2 octets)."""
+        value_a &= 0xFF
+        value_b &= 0xFF
+        self.bus.write_i2c_block_data(self._addr_map[mcp], OLATA, [value_a, value_b])
+        self._olat[(mcp, OLATA)] = value_a
+        self._olat[(mcp, OLATB)] = value_b
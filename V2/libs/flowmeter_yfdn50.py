@@ -9,20 +9,31 @@
 #
 # Implémentation:
 #  - Si callbacks lgpio dispo -> interruptions
+#    (tally=True: compteur interne lgpio, aucun code Python du module par impulsion)
 #  - Sinon fallback polling léger (1 kHz par défaut)
 # --------------------------------------
 
 from __future__ import annotations
 
+import itertools
+import logging
+import os
 import time
 import threading
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Tuple
 
 import lgpio
 
+# Constantes lgpio résolues une fois (valeurs courantes en repli)
+_EDGE_MAP = {
+    "FALLING": getattr(lgpio, "FALLING_EDGE", 2),
+    "RISING": getattr(lgpio, "RISING_EDGE", 1),
+    "BOTH": getattr(lgpio, "BOTH_EDGES", 3),
+}
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class FlowMeterConfig:
     gpio_bcm: int = 21
     pulses_per_liter: float = 12.0
@@ -31,29 +42,55 @@ class FlowMeterConfig:
     edge: str = "FALLING"           # "FALLING" / "RISING" / "BOTH"
     chip: int = 0
     poll_hz_fallback: int = 1000    # utilisé seulement si callbacks indisponibles
+    tally: bool = False             # compte via cb.tally() lgpio (anti-rebond noyau seul)
+    rt_cpu: Optional[int] = None    # thread de comptage épinglé sur ce CPU (ex: 3 avec isolcpus=3)
+    rt_priority: int = 0            # > 0: SCHED_FIFO pour le thread de comptage (root/CAP_SYS_NICE)
 
 
 class FlowMeterYFDN50:
     def __init__(self, cfg: FlowMeterConfig = FlowMeterConfig(), gpiochip_handle: Optional[int] = None):
         self.cfg = cfg
 
-        self._lock = threading.RLock()
+        self._lock = threading.Lock()  # jamais ré-entrant (aucun appel imbriqué sous verrou)
         self._running = False
+        self._stop = threading.Event()  # réveille la boucle polling immédiatement à l'arrêt
+
+        # Compteur d'impulsions sans verrou: seul le callback appelle next() (atomique
+        # sous CPython) et publie la valeur dans _pulse_count (affectation atomique).
+        # Les lecteurs travaillent par différence: total = count - base.
+        self._pulse_ctr = itertools.count(1)
+        self._pulse_count = 0
+        self._pulse_base = 0      # valeur de _pulse_count au dernier reset
+        self._sample_count = 0    # valeur de _pulse_count au dernier calcul de débit
+
+        # mode tally: count = _tally_offset + cb.tally() tant que le callback est actif
+        self._tally_cb = None
+        self._tally_offset = 0
+
+        # (total impulsions, débit L/min) publié d'un bloc par _sample: lecture sans verrou.
+        # Pas de thread de calcul: le débit est recalculé à la lecture, au plus une fois
+        # par sample_period_s (moyenne sur l'intervalle écoulé depuis le calcul précédent,
+        # nouvelle fenêtre si cet intervalle dépasse 2 périodes, cf. _sample).
+        self._snapshot: Tuple[int, float] = (0, 0.0)
+        self._last_update_ns = time.monotonic_ns()
 
-        self._pulse_total = 0
-        self._pulse_since = 0
-
-        self._flow_l_min = 0.0
-        self._last_update_t = time.monotonic()
-
-        self._thread: Optional[threading.Thread] = None
         self._cb = None  # callback handle si utilisé
 
         self._own_handle = gpiochip_handle is None
         self.h = gpiochip_handle if gpiochip_handle is not None else lgpio.gpiochip_open(int(cfg.chip))
 
+        # paramètres figés, résolus une fois (pas de cfg.xxx / lgpio.xxx dans les chemins chauds)
+        self._gpio = int(cfg.gpio_bcm)
+        self._edge_name = str(cfg.edge).upper()
+        self._edge = _EDGE_MAP.get(self._edge_name, _EDGE_MAP["BOTH"])
+        # litres par impulsion (multiplication au lieu d'une division); K <= 0 => 0.0, testé une fois
+        k = float(cfg.pulses_per_liter)
+        self._k_inv = 1.0 / k if k > 0 else 0.0
+        self._period_ns = int(float(cfg.sample_period_s) * 1_000_000_000)
+
         # état pour anti-rebond simple
         self._last_pulse_ns = 0
+        self._min_dt_ns = int(cfg.bouncetime_ms * 1_000_000)
 
     # -----------------
     # Lifecycle
@@ -63,16 +100,11 @@ class FlowMeterYFDN50:
             if self._running:
                 return
 
-            # input
-            lgpio.gpio_claim_input(self.h, int(self.cfg.gpio_bcm))
-
-            self._pulse_total = 0
-            self._pulse_since = 0
-            self._flow_l_min = 0.0
-            self._last_update_t = time.monotonic()
+            self._snapshot = (0, 0.0)
             self._last_pulse_ns = 0
 
             self._running = True
+            self._stop.clear()
 
             # Essaye mode callback/alert si disponible, sinon fallback polling
             if hasattr(lgpio, "callback"):
@@ -80,27 +112,33 @@ class FlowMeterYFDN50:
             else:
                 self._start_polling_mode()
 
-            self._thread = threading.Thread(target=self._worker, daemon=True)
-            self._thread.start()
+            count = self._read_count()
+            self._pulse_base = count
+            self._sample_count = count
+            self._last_update_ns = time.monotonic_ns()
 
     def stop(self) -> None:
         with self._lock:
             if not self._running:
                 return
             self._running = False
+            self._stop.set()
 
-        # stop callback/polling
+        # mode tally: on fige le compte avant d'annuler le callback
+        if self._tally_cb is not None:
+            self._pulse_count = self._read_count()
+            self._tally_cb = None
+
+        # stop callback/polling (thread polling: déjà réveillé par _stop, on attend sa fin)
         try:
-            if self._cb is not None and hasattr(self._cb, "cancel"):
+            if isinstance(self._cb, threading.Thread):
+                self._cb.join(timeout=1.0)
+            elif self._cb is not None and hasattr(self._cb, "cancel"):
                 self._cb.cancel()
         except Exception:
             pass
         self._cb = None
 
-        th = self._thread
-        if th is not None:
-            th.join(timeout=1.0)
-
     def cleanup(self) -> None:
         self.stop()
         if self._own_handle:
@@ -112,123 +150,191 @@ class FlowMeterYFDN50:
     # -----------------
     # API lecture
     # -----------------
+    # Getters sans verrou: lectures d'attributs atomiques (int, tuple) sous CPython.
     def get_flow_l_min(self) -> float:
-        with self._lock:
-            return float(self._flow_l_min)
+        self._sample()
+        return self._snapshot[1]
 
     def get_total_liters(self) -> float:
-        with self._lock:
-            return self._pulse_total / self.cfg.pulses_per_liter
+        return self.get_total_pulses() * self._k_inv
 
     def get_total_pulses(self) -> int:
-        with self._lock:
-            return int(self._pulse_total)
+        return self._read_count() - self._pulse_base
+
+    def get_snapshot(self) -> Tuple[float, float]:
+        """
+        (total litres, débit L/min) cohérents entre eux, à la date du dernier échantillon.
+        """
+        self._sample()
+        total, flow = self._snapshot
+        return total * self._k_inv, flow
 
     def reset_total(self) -> None:
         with self._lock:
-            self._pulse_total = 0
-            self._pulse_since = 0
-            self._flow_l_min = 0.0
-            self._last_update_t = time.monotonic()
+            count = self._read_count()
+            self._pulse_base = count
+            self._sample_count = count
+            self._snapshot = (0, 0.0)
+            self._last_update_ns = time.monotonic_ns()
             self._last_pulse_ns = 0
 
     # -----------------
     # Internals
     # -----------------
-    def _edge_const(self) -> int:
-        # Constantes lgpio: on reste défensif
-        e = str(self.cfg.edge).upper()
-        if hasattr(lgpio, "FALLING_EDGE") and hasattr(lgpio, "RISING_EDGE") and hasattr(lgpio, "BOTH_EDGES"):
-            if e == "FALLING":
-                return lgpio.FALLING_EDGE
-            if e == "RISING":
-                return lgpio.RISING_EDGE
-            return lgpio.BOTH_EDGES
-
-        # fallback (valeurs courantes)
-        if e == "FALLING":
-            return 2
-        if e == "RISING":
-            return 1
-        return 3
+    def _read_count(self) -> int:
+        """Nombre d'impulsions depuis la création (compteur monotone)."""
+        cb = self._tally_cb
+        if cb is not None:
+            return self._tally_offset + int(cb.tally())
+        return self._pulse_count
 
     def _start_callback_mode(self) -> None:
         """
         Utilise lgpio.callback(handle, gpio, edge, func) si dispo.
-        """
-        edge = self._edge_const()
+        Le GPIO est réclamé en "alert" (requis pour les callbacks), avec l'anti-rebond
+        noyau si disponible: les rebonds ne remontent plus jusqu'à Python et le callback
+        ne fait que compter. Sinon, anti-rebond logiciel de _on_pulse.
 
-        def _cb_fn(chip, gpio, level, tick):
-            # tick: dépend de lgpio; on ignore et on fait notre anti-rebond monotonic_ns
-            self._on_pulse(level)
+        cfg.tally: callback sans fonction -> lgpio compte lui-même les fronts, les
+        lectures (getters) utilisent cb.tally() (seul l'anti-rebond noyau s'applique).
+        """
+        edge = self._edge
+        gpio = self._gpio
+        if hasattr(lgpio, "gpio_claim_alert"):
+            lgpio.gpio_claim_alert(self.h, gpio, edge)
+        else:
+            lgpio.gpio_claim_input(self.h, gpio)
+        kernel_debounce = self.cfg.bouncetime_ms <= 0
+        if hasattr(lgpio, "gpio_set_debounce_micros") and not kernel_debounce:
+            try:
+                lgpio.gpio_set_debounce_micros(self.h, gpio, int(self.cfg.bouncetime_ms * 1000))
+                kernel_debounce = True
+            except Exception:
+                pass
 
-        self._cb = lgpio.callback(self.h, int(self.cfg.gpio_bcm), edge, _cb_fn)
+        rt = self.cfg.rt_cpu is not None or int(self.cfg.rt_priority) > 0
+
+        if self.cfg.tally:
+            cb = lgpio.callback(self.h, gpio, edge)
+            if hasattr(cb, "tally"):
+                self._tally_offset = self._pulse_count
+                self._cb = cb
+                self._tally_cb = cb
+                if rt:
+                    logging.getLogger("machine").warning(
+                        "Débitmètre: rt_cpu/rt_priority ignorés en mode tally (aucun callback Python)")
+                return
+            cb.cancel()
+
+        if kernel_debounce:
+            def _cb_fn(chip, gpio, level, tick):
+                # anti-rebond déjà fait par le noyau: comptage seul
+                if self._running:
+                    self._pulse_count = next(self._pulse_ctr)
+        else:
+            def _cb_fn(chip, gpio, level, tick):
+                # tick: dépend de lgpio; on ignore et on fait notre anti-rebond monotonic_ns
+                self._on_pulse(level)
+
+        if rt:
+            # rt_cpu/rt_priority appliqués depuis le thread de notification lgpio lui-même,
+            # au premier front (ce thread est créé par lgpio: pas d'autre point d'entrée)
+            count_fn = _cb_fn
+            pending = [True]
+
+            def _cb_fn(chip, gpio, level, tick):
+                if pending:
+                    pending.clear()
+                    self._apply_rt_sched()
+                count_fn(chip, gpio, level, tick)
+
+        self._cb = lgpio.callback(self.h, gpio, edge, _cb_fn)
 
     def _start_polling_mode(self) -> None:
         """
         Fallback si callbacks indisponibles: polling léger.
+        (lgpio.callback existe dans toutes les versions lgpio publiées: ce chemin ne sert
+        qu'en secours. Période gardée à 1 ms: à débit max le YF-DN50 donne des impulsions
+        de ~4 ms, une période plus longue en raterait.)
         """
         period_s = 1.0 / max(10, int(self.cfg.poll_hz_fallback))
-        edge = str(self.cfg.edge).upper()
-        gpio = int(self.cfg.gpio_bcm)
+        edge = self._edge_name
+        gpio = self._gpio
+        lgpio.gpio_claim_input(self.h, gpio)
+
+        # niveau après transition qui compte comme impulsion (None = les deux fronts)
+        counted_level = 0 if edge == "FALLING" else 1 if edge == "RISING" else None
 
         def poll_loop():
-            last_level = lgpio.gpio_read(self.h, gpio)
-            while True:
-                with self._lock:
-                    if not self._running:
-                        return
-                time.sleep(period_s)
-                level = lgpio.gpio_read(self.h, gpio)
+            self._apply_rt_sched()
+            h, read, wait, on_pulse = self.h, lgpio.gpio_read, self._stop.wait, self._on_pulse
+            last_level = read(h, gpio)
+            while not wait(period_s):
+                level = read(h, gpio)
                 if level == last_level:
                     continue
-
-                # transition détectée
-                if edge == "FALLING" and (last_level == 1 and level == 0):
-                    self._on_pulse(level)
-                elif edge == "RISING" and (last_level == 0 and level == 1):
-                    self._on_pulse(level)
-                elif edge == "BOTH":
-                    self._on_pulse(level)
-
                 last_level = level
+                if counted_level is None or level == counted_level:
+                    on_pulse(level)
 
         t = threading.Thread(target=poll_loop, daemon=True)
         t.start()
         self._cb = t  # juste pour garder une référence
 
+    def _apply_rt_sched(self) -> None:
+        """
+        Thread courant (callback lgpio ou polling) sur cfg.rt_cpu et/ou en SCHED_FIFO
+        cfg.rt_priority: borne la latence face au GC / I/O des autres threads.
+        Mode callback: le thread de notification lgpio est partagé par tous les callbacks
+        lgpio du process (entrées MCP incluses), ils en héritent.
+        Best effort (droits, OS): un échec est journalisé, le comptage continue.
+        """
+        cpu, prio = self.cfg.rt_cpu, int(self.cfg.rt_priority)
+        try:
+            if cpu is not None:
+                os.sched_setaffinity(0, {int(cpu)})
+            if prio > 0:
+                os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(prio))
+        except (OSError, AttributeError) as e:
+            logging.getLogger("machine").warning(
+                "Débitmètre: rt_cpu=%s / rt_priority=%s non appliqués: %s", cpu, prio, e)
+
     def _on_pulse(self, _level: int) -> None:
-        # anti-rebond minimal (bouncetime_ms)
+        # Appelé par un seul thread (callback lgpio ou boucle polling): pas de verrou.
+        # Anti-rebond minimal (bouncetime_ms) en premier: un rebond ne coûte qu'une
+        # comparaison. Horodatage posé avant de compter (pas de double comptage).
         now_ns = time.monotonic_ns()
-        min_dt_ns = int(self.cfg.bouncetime_ms * 1_000_000)
+        if (now_ns - self._last_pulse_ns) < self._min_dt_ns:
+            return
+        self._last_pulse_ns = now_ns
+        if self._running:
+            self._pulse_count = next(self._pulse_ctr)
+
+    def _sample(self) -> None:
+        """
+        Recalcule le débit si sample_period_s est écoulé depuis le dernier calcul.
+        Chemin courant (période non écoulée, ou compteur arrêté): aucun verrou.
+        Après une longue période sans lecture (ex: IDLE, où le LCD ne lit pas le débit),
+        la moyenne sur tout l'intervalle sous-estimerait le débit: on repart d'une
+        nouvelle fenêtre (débit 0.0 jusqu'au calcul suivant).
+        """
+        now_ns = time.monotonic_ns()
+        period_ns = self._period_ns
+        if not self._running or (now_ns - self._last_update_ns) < period_ns:
+            return
+
         with self._lock:
-            if not self._running:
-                return
-            if (now_ns - self._last_pulse_ns) < min_dt_ns:
-                return
-            self._last_pulse_ns = now_ns
-            self._pulse_total += 1
-            self._pulse_since += 1
-
-    def _worker(self) -> None:
-        while True:
-            with self._lock:
-                if not self._running:
-                    return
-                period = float(self.cfg.sample_period_s)
-
-            time.sleep(period)
-
-            now = time.monotonic()
-            with self._lock:
-                dt = now - self._last_update_t
-                pulses = self._pulse_since
-                self._pulse_since = 0
-                self._last_update_t = now
-
-                if dt <= 0 or self.cfg.pulses_per_liter <= 0:
-                    self._flow_l_min = 0.0
-                else:
-                    liters = pulses / self.cfg.pulses_per_liter
-                    l_per_s = liters / dt
-                    self._flow_l_min = l_per_s * 60.0
+            dt_ns = now_ns - self._last_update_ns
+            if dt_ns < period_ns:
+                return  # déjà recalculé par un autre lecteur
+            count = self._read_count()
+            pulses = count - self._sample_count
+            self._sample_count = count
+            self._last_update_ns = now_ns
+
+            if dt_ns <= 0 or dt_ns > 2 * period_ns:
+                flow = 0.0
+            else:
+                # L/min = litres * 60 s / (dt_ns * 1e-9 s)
+                flow = pulses * self._k_inv * 60e9 / dt_ns
+            self._snapshot = (count - self._pulse_base, flow)
@@ -1,8 +1,74 @@
 #!/usr/bin/python3
 
 
-import smbus
 import time
+import unicodedata
+
+from smbus2 import SMBus, i2c_msg
+
+
+# Un SMBus par numéro de bus (un seul open de /dev/i2c-N), partagé entre instances
+_BUS_CACHE = {}
+
+
+def _get_bus(bus_id):
+  bus = _BUS_CACHE.get(bus_id)
+  if bus is None:
+    bus = _BUS_CACHE[bus_id] = SMBus(bus_id)
+  return bus
+
+
+def _build_frames(mode, backlight, enable=0b00000100):
+  # octet -> 6 états PCF8574: nibble haut puis bas, chacun E bas / E haut / E bas.
+  # Le temps bit I2C (~90 us/octet à 100 kHz) couvre l'impulsion E (>= 450 ns)
+  # et l'exécution HD44780 (37 us): pas de sleep entre les états.
+  table = []
+  for b in range(256):
+    high = mode | (b & 0xF0) | backlight
+    low = mode | ((b << 4) & 0xF0) | backlight
+    table.append(bytes((high, high | enable, high, low, low | enable, low)))
+  return tuple(table)
+
+
+def _diff_span(old, new):
+  # plage [i, j) de new qui diffère de old (même longueur): préfixe et suffixe communs exclus
+  i, j = 0, len(new)
+  while i < j and old[i] == new[i]:
+    i += 1
+  while j > i and old[j - 1] == new[j - 1]:
+    j -= 1
+  return i, j
+
+
+# CGROM A00 (ROM standard HD44780): glyphes non-ASCII disponibles
+_A00_GLYPHS = {"°": 0xDF, "ä": 0xE1, "ß": 0xE2, "µ": 0xE4, "ö": 0xEF, "ü": 0xF5, "÷": 0xFD}
+
+
+def _build_a00_table():
+  # str.translate latin-1 -> A00, 1 caractère pour 1 (colonnes inchangées):
+  # accents absents de la ROM ("é", "à", "ç"...) -> lettre de base, non imprimable -> "?"
+  table = {}
+  for cp in range(0x80, 0x100):
+    base = unicodedata.normalize("NFKD", chr(cp))[:1]
+    table[cp] = base if base.isascii() and base.isprintable() else "?"
+  for ch, code in _A00_GLYPHS.items():
+    table[ord(ch)] = chr(code)
+  table.update({0x2018: "'", 0x2019: "'", 0x2013: "-", 0x2014: "-", 0x0152: "O", 0x0153: "o"})
+  return table
+
+
+_A00_TABLE = _build_a00_table()
+
+
+# Tables précalculées (mode CMD=0 / CHR=1) x (backlight ON=0x08 / OFF=0x00)
+_FRAMES = {(mode, bl): _build_frames(mode, bl) for mode in (0, 1) for bl in (0x08, 0x00)}
+
+# Séquence d'init par backlight: 0x33 seul (attente > 4.1 ms ensuite), puis 0x32 0x06 0x0C 0x28
+# enchaînés dans une seule transaction. Le Clear (0x01) final passe par clear().
+_INIT_BLOBS = {
+  bl: (_FRAMES[(0, bl)][0x33], b"".join(_FRAMES[(0, bl)][cmd] for cmd in (0x32, 0x06, 0x0C, 0x28)))
+  for bl in (0x08, 0x00)
+}
 
 
 class LCDI2C_backpack(object):
@@ -26,27 +92,31 @@ class LCDI2C_backpack(object):
 
   ENABLE = 0b00000100
 
-  # Timing
-  E_PULSE = 0.0005
-  E_DELAY = 0.0005
-
-  # I2C bus
-  bus = smbus.SMBus(1)
+  # Timing (seules attentes nécessaires: le temps I2C couvre les autres commandes, 37 us)
+  INIT_DELAY  = 0.005   # après 0x33 (passage en mode 8 bits: > 4.1 ms)
+  CLEAR_DELAY = 0.002   # après Clear (0x01) / Home (0x02): 1.52 ms
 
-  def __init__(self, I2C_ADDR: int = 0x27):
+  def __init__(self, I2C_ADDR: int = 0x27, I2C_BUS: int = 1):
     self.I2C_ADDR = I2C_ADDR
+    self.bus = _get_bus(I2C_BUS)
     self._backlight = self.LCD_BACKLIGHT_ON
+    # texte affiché par adresse de ligne: une ligne identique ne repart pas sur l'I2C
+    self._line_cache = {}
+    # clear_line: blob constant (adresse + espaces) par (ligne, backlight), calculé une fois
+    self._blank = " " * self.LCD_WIDTH
+    self._blank_frames = {
+      (line, bl): _FRAMES[(self.LCD_CMD, bl)][line] + _FRAMES[(self.LCD_CHR, bl)][0x20] * self.LCD_WIDTH
+      for line in (self.LCD_LINE_1, self.LCD_LINE_2, self.LCD_LINE_3, self.LCD_LINE_4)
+      for bl in (self.LCD_BACKLIGHT_ON, self.LCD_BACKLIGHT_OFF)
+    }
     self.init()
-    self.clear()
 
   def init(self):
-    self.lcd_byte(0x33, self.LCD_CMD)
-    self.lcd_byte(0x32, self.LCD_CMD)
-    self.lcd_byte(0x06, self.LCD_CMD)
-    self.lcd_byte(0x0C, self.LCD_CMD)
-    self.lcd_byte(0x28, self.LCD_CMD)
-    self.lcd_byte(0x01, self.LCD_CMD)
-    time.sleep(self.E_DELAY)
+    part1, part2 = _INIT_BLOBS[self._backlight]
+    self._send(part1)
+    time.sleep(self.INIT_DELAY)
+    self._send(part2)
+    self.clear()
 
   # ---------- Backlight ----------
 
@@ -61,35 +131,43 @@ class LCDI2C_backpack(object):
   # ---------- High-level API ----------
 
   def write_centered(self, message: str, line: int):
-    msg = (message or "")[:self.LCD_WIDTH]
-    left_pad = (self.LCD_WIDTH - len(msg)) // 2
-    out = (" " * left_pad + msg).ljust(self.LCD_WIDTH, " ")
-    self.lcd_string(out, line)
+    self.lcd_string((message or "")[:self.LCD_WIDTH].center(self.LCD_WIDTH), line)
 
   def lcd_string(self, message, line):
-    message = (message or "").ljust(self.LCD_WIDTH, " ")
-    self.lcd_byte(line, self.LCD_CMD)
-    for i in range(self.LCD_WIDTH):
-      self.lcd_byte(ord(message[i]), self.LCD_CHR)
+    # Adresse + caractères modifiés seulement (ligne entière si inconnue), une transaction I2C
+    message = (message or "").ljust(self.LCD_WIDTH, " ")[:self.LCD_WIDTH]
+    old = self._line_cache.get(line)
+    if old == message:
+      return
+    i, j = (0, self.LCD_WIDTH) if old is None else _diff_span(old, message)
+    # retiré pendant l'écriture: une erreur I2C ne laisse pas un cache faux
+    self._line_cache.pop(line, None)
+    chr_frames = _FRAMES[(self.LCD_CHR, self._backlight)]
+    data = message[i:j].translate(_A00_TABLE).encode("latin-1", "replace")
+    self._send(self._frames(line + i, self.LCD_CMD) + b"".join(map(chr_frames.__getitem__, data)))
+    self._line_cache[line] = message
+
+  def clear_line(self, line):
+    if self._line_cache.get(line) == self._blank:
+      return
+    self._line_cache.pop(line, None)
+    self._send(self._blank_frames[(line, self._backlight)])
+    self._line_cache[line] = self._blank
 
   def clear(self):
+    self._line_cache.clear()
     self.lcd_byte(0x01, self.LCD_CMD)
 
   # ---------- Low-level ----------
 
-  def lcd_byte(self, bits, mode):
-    bits_high = mode | (bits & 0xF0) | self._backlight
-    bits_low  = mode | ((bits << 4) & 0xF0) | self._backlight
-
-    self.bus.write_byte(self.I2C_ADDR, bits_high)
-    self.lcd_toggle_enable(bits_high)
+  def _frames(self, bits, mode):
+    return _FRAMES[(mode, self._backlight)][bits & 0xFF]
 
-    self.bus.write_byte(self.I2C_ADDR, bits_low)
-    self.lcd_toggle_enable(bits_low)
+  def _send(self, buf):
+    self.bus.i2c_rdwr(i2c_msg.write(self.I2C_ADDR, buf))
 
-  def lcd_toggle_enable(self, bits):
-    time.sleep(self.E_DELAY)
-    self.bus.write_byte(self.I2C_ADDR, (bits | self.ENABLE))
-    time.sleep(self.E_PULSE)
-    self.bus.write_byte(self.I2C_ADDR, (bits & ~self.ENABLE))
-    time.sleep(self.E_DELAY)
+  def lcd_byte(self, bits, mode):
+    self._send(self._frames(bits, mode))
+    # Clear / Home: commandes lentes, les suivantes seraient ignorées
+    if mode == self.LCD_CMD and 0x01 <= bits <= 0x03:
+      time.sleep(self.CLEAR_DELAY)
@@ -11,9 +11,13 @@
 
 from __future__ import annotations
 
+import heapq
+import itertools
+import logging
 import threading
+import time
 from dataclasses import dataclass
-from typing import Optional
+from typing import Callable, List, Optional, Tuple
 
 import lgpio
 
@@ -27,6 +31,66 @@ class CriticalRelaysConfig:
     chip: int = 0  # gpiochip index
 
 
+class _Scheduled:
+    """Jeton d'une échéance: cancel() suffit, l'entrée est ignorée à l'expiration."""
+    __slots__ = ("cancelled",)
+
+    def __init__(self) -> None:
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class _PulseScheduler:
+    """
+    Un seul thread (démarré au premier pulse) pour toutes les fins de pulse relais,
+    au lieu d'un threading.Timer (= un thread) par pulse.
+    Échéances dans un heapq; fn(jeton) appelée hors verrou du scheduler.
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[float, int, _Scheduled, Callable[[_Scheduled], None]]] = []
+        self._seq = itertools.count()
+        self._cv = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, delay_s: float, fn: Callable[[_Scheduled], None]) -> _Scheduled:
+        tok = _Scheduled()
+        with self._cv:
+            heapq.heappush(self._heap, (time.monotonic() + delay_s, next(self._seq), tok, fn))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="relay-timers", daemon=True)
+                self._thread.start()
+            self._cv.notify()
+        return tok
+
+    def _run(self) -> None:
+        heap = self._heap
+        while True:
+            with self._cv:
+                while True:
+                    while heap and heap[0][2].cancelled:
+                        heapq.heappop(heap)
+                    if not heap:
+                        self._cv.wait()
+                        continue
+                    delay = heap[0][0] - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._cv.wait(delay)
+                _, _, tok, fn = heapq.heappop(heap)
+            if not tok.cancelled:
+                try:
+                    fn(tok)
+                except Exception:
+                    # Le thread reste vivant : on trace l'erreur sans bloquer les autres fins d'impulsion
+                    logging.getLogger("machine").exception("Relais: erreur en fin d'impulsion (%r)", fn)
+
+
+_scheduler = _PulseScheduler()
+
+
 class CriticalRelays:
     """
     Version lgpio.
@@ -52,9 +116,9 @@ class CriticalRelays:
         self._pump_on_level = 1 if active_high_pump else 0
         self._pump_off_level = 0 if active_high_pump else 1
 
-        self._air_timer: Optional[threading.Timer] = None
-        self._pump_timer: Optional[threading.Timer] = None
-        self._lock = threading.RLock()
+        self._air_timer: Optional[_Scheduled] = None
+        self._pump_timer: Optional[_Scheduled] = None
+        self._lock = threading.Lock()  # non ré-entrant: pas d'appel aux méthodes publiques sous verrou
 
         self._own_handle = gpiochip_handle is None
         self.h = gpiochip_handle if gpiochip_handle is not None else lgpio.gpiochip_open(int(chip))
@@ -82,13 +146,10 @@ class CriticalRelays:
 
             d = float(duration_s)
             if d <= 0:
-                self.air_off()
+                lgpio.gpio_write(self.h, self.pin_air, self._air_off_level)
                 return
 
-            t = threading.Timer(d, self.air_off)
-            t.daemon = True
-            self._air_timer = t
-            t.start()
+            self._air_timer = _scheduler.schedule(d, self._air_pulse_end)
 
     def pump(self, duration_s: float) -> None:
         """
@@ -101,13 +162,10 @@ class CriticalRelays:
 
             d = float(duration_s)
             if d <= 0:
-                self.pump_off()
+                lgpio.gpio_write(self.h, self.pin_pump, self._pump_off_level)
                 return
 
-            t = threading.Timer(d, self.pump_off)
-            t.daemon = True
-            self._pump_timer = t
-            t.start()
+            self._pump_timer = _scheduler.schedule(d, self._pump_pulse_end)
 
     def air_on(self) -> None:
         with self._lock:
@@ -125,8 +183,14 @@ class CriticalRelays:
             lgpio.gpio_write(self.h, self.pin_pump, self._pump_off_level)
 
     def all_off(self) -> None:
-        self.air_off()
-        self.pump_off()
+        # Un seul verrou pour les deux relais (chemin SAFE / arrêt).
+        # Pas de lgpio.group_write: il exige un groupe réclamé via group_claim_output,
+        # dont seul le "leader" est ensuite écrivable -> casserait air_on()/pump().
+        with self._lock:
+            self._cancel_air_timer()
+            self._cancel_pump_timer()
+            lgpio.gpio_write(self.h, self.pin_air, self._air_off_level)
+            lgpio.gpio_write(self.h, self.pin_pump, self._pump_off_level)
 
     def cleanup(self) -> None:
         # Pas de cleanup global destructif (contrairement à RPi.GPIO).
@@ -143,6 +207,21 @@ class CriticalRelays:
     # Internes
     # --------------------
 
+    def _air_pulse_end(self, tok: _Scheduled) -> None:
+        # n'agit que si ce pulse est toujours le pulse courant (pas annulé/remplacé entre-temps)
+        with self._lock:
+            if self._air_timer is not tok:
+                return
+            self._air_timer = None
+            lgpio.gpio_write(self.h, self.pin_air, self._air_off_level)
+
+    def _pump_pulse_end(self, tok: _Scheduled) -> None:
+        with self._lock:
+            if self._pump_timer is not tok:
+                return
+            self._pump_timer = None
+            lgpio.gpio_write(self.h, self.pin_pump, self._pump_off_level)
+
     def _cancel_air_timer(self) -> None:
         if self._air_timer is not None:
             try:
@@ -1,14 +1,22 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import contextlib
 import os
+import select
 import time
 import signal
 from pathlib import Path
 
 import yaml
 
-from core.logging_setup import setup_logging
+# Loader C (libyaml) si disponible, bien plus rapide que safe_load pur Python
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML compilé sans libyaml
+    from yaml import SafeLoader as _YamlLoader
+
+from core.logging_setup import setup_logging, stop_logging
 from core.fsm import MachineFSM
 
 from hal.i2c_bus import I2CBus, I2CConfig, scan_i2c
@@ -17,6 +25,7 @@ from hal.gpio_lgpio import GpioLgpio
 from hw.mcp_hub import MCPHub, McpAddressing
 from hw.inputs import Inputs
 from hw.leds import ProgramLeds
+from hw.lcd_writer import LcdWriter
 
 from driver.motors import Motors, MotorsConfig
 
@@ -39,7 +48,7 @@ DEFAULT_CONFIG = {
         "lgpio_chip": 0,
     },
     "motors": {"microsteps_per_rev": 3200, "ena_settle_ms": 10, "dir_setup_us": 5, "invert_dir": {}},
-    "inputs": {"poll_hz": 100, "debounce_ms": 30},
+    "inputs": {"poll_hz": 100, "debounce_ms": 30, "int_gpio": None},
     "flowmeter": {"pulses_per_liter": 12.0, "sample_period_s": 1.0, "edge": "FALLING"},
 }
 
@@ -48,7 +57,7 @@ def load_config(path: str) -> dict:
     if not Path(path).exists():
         return DEFAULT_CONFIG
     with open(path, "r", encoding="utf-8") as f:
-        user_cfg = yaml.safe_load(f) or {}
+        user_cfg = yaml.load(f, Loader=_YamlLoader) or {}
 
     # merge simple (profondeur 1-2, suffisant pour démarrer)
     cfg = DEFAULT_CONFIG.copy()
@@ -97,27 +106,69 @@ def apply_safe(log, relays: CriticalRelays, motors: Motors, leds: ProgramLeds) -
         log.error("SAFE: erreur leds.all_off(): %s", e)
 
 
+def _safely(log, fn, *args) -> None:
+    """
+    Appelle fn(*args) pendant l'arrêt: une erreur est loguée, l'arrêt continue.
+    """
+    try:
+        fn(*args)
+    except Exception as e:
+        log.error("Arrêt: erreur %s(): %s", getattr(fn, "__qualname__", fn), e)
+
+
+def _close_wakeup_pipe(wake_r: int, wake_w: int) -> None:
+    signal.set_wakeup_fd(-1)
+    os.close(wake_r)
+    os.close(wake_w)
+
+
 # -------------------------
 # Main
 # -------------------------
 
 def main() -> None:
-    global _stop
-
     # signaux (systemd stop -> SIGTERM)
     signal.signal(signal.SIGTERM, _handle_sigterm)
     signal.signal(signal.SIGINT, _handle_sigterm)
 
-    cfg = load_config("config/config.yaml")
+    # self-pipe: chaque signal y écrit un octet -> l'attente du tick se termine aussitôt
+    wake_r, wake_w = os.pipe()
+    os.set_blocking(wake_r, False)
+    os.set_blocking(wake_w, False)
+    signal.set_wakeup_fd(wake_w)
+
+    # Arrêt = déroulement LIFO de la pile: chaque module est arrêté dans l'ordre inverse
+    # de sa création, y compris si le démarrage échoue à mi-chemin.
+    with contextlib.ExitStack() as stack:
+        stack.callback(_close_wakeup_pipe, wake_r, wake_w)
+
+        cfg = load_config("config/config.yaml")
 
-    log = setup_logging(cfg["logging"]["dir"], level=cfg["logging"]["level"])
-    log.info("Démarrage machine_ctrl (main.py)")
+        log = setup_logging(cfg["logging"]["dir"], level=cfg["logging"]["level"])
+        stack.callback(stop_logging)
+        stack.callback(log.info, "Arrêt terminé")
+        log.info("Démarrage machine_ctrl (main.py)")
+        _run(stack, cfg, log, wake_r)
+
+
+def _run(stack: contextlib.ExitStack, cfg: dict, log, wake_r: int) -> None:
+    """
+    Initialise les modules (chaque arrêt est empilé dans stack dès la création) puis tourne
+    la boucle principale jusqu'à SIGTERM/SIGINT.
+    """
 
     # I2C
     i2c_bus_num = int(cfg["i2c"]["bus"])
     bus = I2CBus(I2CConfig(bus=i2c_bus_num, retries=3, retry_delay_s=0.01))
-    found = scan_i2c(bus)
+    stack.callback(_safely, log, bus.close)
+    expected = [int(cfg["i2c"][k]) for k in ("mcp1", "mcp2", "mcp3", "lcd")]
+    found = scan_i2c(bus, expected=expected, tries=2)
     log.info("I2C détectés: %s", [hex(a) for a in found])
+    missing = sorted(set(expected) - set(found))
+    if missing:
+        log.warning("I2C absents: %s", [hex(a) for a in missing])
+        # diagnostic seulement si un device manque (balayage complet 0x03..0x77)
+        log.warning("I2C présents (scan complet): %s", [hex(a) for a in scan_i2c(bus)])
 
     # MCP Hub
     addrs = McpAddressing(
@@ -125,6 +176,9 @@ def main() -> None:
         mcp2=int(cfg["i2c"]["mcp2"]),
         mcp3=int(cfg["i2c"]["mcp3"]),
     )
+    # init_all() écrit tout le bloc de config (IODIRA..OLATB) de chaque MCP: appelé ici,
+    # AVANT inputs.start() qui active les interruptions (Inputs._start_irq). Un init_all()
+    # ultérieur (ré-init après erreur bus) ré-écrit les masques IRQ mémorisés par le hub.
     mcp = MCPHub(bus, addrs)
     mcp.init_all()
     log.info("MCPHub initialisé")
@@ -133,6 +187,10 @@ def main() -> None:
     leds = ProgramLeds(mcp, active_high=True)
     leds.all_off()
 
+    # Handle lgpio unique (INT inputs, relais, flowmeter, STEP moteurs), fermé par gpio.close() seul
+    gpio = GpioLgpio(chip=int(cfg["gpio"]["lgpio_chip"]))
+    stack.callback(_safely, log, gpio.close)
+
     # Inputs (thread interne, via MCPHub)
     inputs = Inputs(
         mcp=mcp,
@@ -140,43 +198,56 @@ def main() -> None:
         debounce_ms=int(cfg["inputs"]["debounce_ms"]),
         active_low_buttons=True,
         active_low_selectors=True,
+        int_gpio=cfg["inputs"].get("int_gpio"),
+        chip=int(cfg["gpio"]["lgpio_chip"]),
+        gpiochip_handle=gpio.h,
     )
     inputs.start()
+    stack.callback(_safely, log, inputs.stop)
     log.info("Inputs démarré (poll + debounce)")
 
     # LCD (ta lib) - I2C direct, indépendant du MCPHub
     lcd_addr = int(cfg["i2c"]["lcd"])
-    lcd = LCDI2C_backpack(I2C_ADDR=lcd_addr)
-    lcd.clear()
+    lcd_dev = LCDI2C_backpack(I2C_ADDR=lcd_addr)
+    lcd_dev.clear()
+    # écritures dans un thread dédié: le tick FSM ne bloque pas sur les ~30-50 ms d'I2C LCD
+    lcd = LcdWriter(lcd_dev)
+    lcd.start()
+    stack.callback(_safely, log, lcd.stop)
     log.info("LCD initialisé sur 0x%02X", lcd_addr)
 
-    # Relais critiques (ta lib, RPi.GPIO)
+    # Relais critiques (ta lib, lgpio)
     pin_air = int(cfg["gpio"]["relays"]["air"])
     pin_pump = int(cfg["gpio"]["relays"]["pump"])
-    relays = CriticalRelays(pin_air=pin_air, pin_pump=pin_pump, active_high_air=True, active_high_pump=True)
+    relays = CriticalRelays(
+        pin_air=pin_air,
+        pin_pump=pin_pump,
+        active_high_air=True,
+        active_high_pump=True,
+        gpiochip_handle=gpio.h,
+    )
+    # Par sécurité, on ne fait pas relays.cleanup() automatiquement: juste tout OFF.
+    stack.callback(_safely, log, relays.all_off)
     log.info("Relais critiques initialisés (air=%d, pump=%d)", pin_air, pin_pump)
 
-    # Flowmeter (ta lib, RPi.GPIO)
-    # edge string -> valeur GPIO
-    edge_str = str(cfg["flowmeter"]["edge"]).upper()
-    try:
-        import RPi.GPIO as GPIO
-        edge_val = GPIO.FALLING if edge_str == "FALLING" else GPIO.RISING
-    except Exception:
-        edge_val = None  # fallback, mais en pratique RPi.GPIO sera dispo
-
+    # Flowmeter (ta lib, lgpio: callback sur front)
     fm_cfg = FlowMeterConfig(
         gpio_bcm=int(cfg["gpio"]["flowmeter"]),
         pulses_per_liter=float(cfg["flowmeter"]["pulses_per_liter"]),
         sample_period_s=float(cfg["flowmeter"]["sample_period_s"]),
-        edge=edge_val,  # FALLING
+        edge=str(cfg["flowmeter"]["edge"]).upper(),  # FALLING / RISING / BOTH
+        chip=int(cfg["gpio"]["lgpio_chip"]),
+        tally=bool(cfg["flowmeter"].get("tally", False)),
+        rt_cpu=cfg["flowmeter"].get("rt_cpu"),
+        rt_priority=int(cfg["flowmeter"].get("rt_priority", 0)),
     )
-    flow = FlowMeterYFDN50(cfg=fm_cfg)
+    flow = FlowMeterYFDN50(cfg=fm_cfg, gpiochip_handle=gpio.h)
     flow.start()
+    # handle partagé: fermé par gpio.close()
+    stack.callback(_safely, log, flow.stop)
     log.info("Flowmeter démarré (GPIO%d, K=%.3f pulses/L)", fm_cfg.gpio_bcm, fm_cfg.pulses_per_liter)
 
     # Moteurs (STEP via lgpio, DIR/ENA via MCPHub)
-    gpio = GpioLgpio(chip=int(cfg["gpio"]["lgpio_chip"]))
     step_pins = {k: int(v) for k, v in cfg["gpio"]["step_pins"].items()}
 
     motors = Motors(
@@ -192,8 +263,10 @@ def main() -> None:
     )
     log.info("Moteurs initialisés (lgpio STEP + MCP DIR/ENA)")
 
-    # SAFE au boot (demandé)
+    # SAFE au boot (demandé), et en premier à l'arrêt
     apply_safe(log, relays, motors, leds)
+    stack.callback(apply_safe, log, relays, motors, leds)
+    stack.callback(log.info, "Arrêt en cours -> SAFE + shutdown modules")
 
     # FSM (IDLE/RUN)
     fsm = MachineFSM(
@@ -205,59 +278,23 @@ def main() -> None:
         logger=log,
     )
 
-    # Affichage initial (FSM fera ensuite les mises à jour)
-    lcd.lcd_string("Choix programme", lcd.LCD_LINE_1)
-    lcd.lcd_string("1..5", lcd.LCD_LINE_2)
-    lcd.lcd_string("Debit: ----.- L/m", lcd.LCD_LINE_3)
-    lcd.lcd_string("Total: ----.- L", lcd.LCD_LINE_4)
+    # Affichage initial: fait par le premier fsm.tick() (rafraîchissement immédiat),
+    # pas d'écriture ici qui serait aussitôt réécrite.
 
     log.info("Boucle principale démarrée")
 
-    try:
-        # Tick régulier : assez rapide pour capter les events, mais léger CPU
-        tick_period_s = 0.05  # 50 ms
-        while not _stop:
-            fsm.tick()
-            time.sleep(tick_period_s)
-
-    finally:
-        log.info("Arrêt en cours -> SAFE + shutdown modules")
-        try:
-            apply_safe(log, relays, motors, leds)
-        except Exception:
-            pass
-
-        # stop inputs
-        try:
-            inputs.stop()
-        except Exception:
-            pass
-
-        # stop flowmeter (sans GPIO.cleanup global)
-        try:
-            flow.stop()
-        except Exception:
-            pass
-
-        # Important: éviter relays.cleanup() si d'autres modules RPi.GPIO tournent,
-        # mais ici on arrête tout, donc c'est OK si tu veux.
-        # Par sécurité, on ne fait pas cleanup global automatiquement.
-        try:
-            relays.all_off()
-        except Exception:
-            pass
-
-        try:
-            bus.close()
-        except Exception:
-            pass
-
-        try:
-            gpio.close()
-        except Exception:
-            pass
-
-        log.info("Arrêt terminé")
+    # Tick régulier : assez rapide pour capter les events, mais léger CPU
+    # Échéances absolues (pas de dérive), attente interrompue par SIGTERM/SIGINT.
+    tick_period_s = 0.05  # 50 ms
+    next_deadline = time.monotonic()
+    while not _stop:
+        fsm.tick()
+        next_deadline += tick_period_s
+        slack = next_deadline - time.monotonic()
+        if slack > 0:
+            select.select([wake_r], [], [], slack)
+        else:
+            next_deadline = time.monotonic()  # en retard: pas de rattrapage en rafale
 
 
 if __name__ == "__main__":
@@ -24,13 +24,19 @@ def main():
 
         log.info("Pattern (3 bips)")
         buz.pattern([(0.08, 2000.0), (0.08, 2200.0), (0.08, 1800.0)], pause_s=0.08)
+        buz.wait()
         time.sleep(0.5)
 
         log.info("Balayage fréquence 500->3000 Hz")
+        # palier de 270 ms (bip 120 ms + pause) sur échéances absolues: pas de dérive
+        next_t = time.monotonic()
         for f in [500, 800, 1200, 1600, 2000, 2400, 2800, 3000]:
             log.info("freq=%d Hz", f)
+            next_t += 0.27
             buz.beep(0.12, f)
-            time.sleep(0.15)
+            dt = next_t - time.monotonic()
+            if dt > 0:
+                time.sleep(dt)
 
     except KeyboardInterrupt:
         pass
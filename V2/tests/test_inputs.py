@@ -17,14 +17,18 @@ def main():
                         level=cfg.get_str("logging.level", "INFO"))
 
     bus = I2CBus(I2CConfig(bus=cfg.get_int("i2c.bus", 1), retries=3, retry_delay_s=0.01))
-    found = scan_i2c(bus)
-    log.info("I2C détectés: %s", [hex(a) for a in found])
 
     addrs = McpAddressing(
         mcp1=int(cfg.get("i2c.mcp1", 0x24)),
         mcp2=int(cfg.get("i2c.mcp2", 0x25)),
         mcp3=int(cfg.get("i2c.mcp3", 0x26)),
     )
+    # adresses connues (config): probe des 3 MCP seulement, balayage complet si l'un manque
+    expected = [addrs.mcp1, addrs.mcp2, addrs.mcp3]
+    found = scan_i2c(bus, expected=expected, tries=2)
+    log.info("I2C détectés: %s", [hex(a) for a in found])
+    if len(found) != len(expected):
+        log.warning("I2C présents (scan complet): %s", [hex(a) for a in scan_i2c(bus)])
     mcp = MCPHub(bus, addrs)
     mcp.init_all()
     log.info("MCPHub OK")
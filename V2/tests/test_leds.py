@@ -39,8 +39,7 @@ def main():
             time.sleep(0.3)
 
         log.info("Toutes ON")
-        for i in range(1, 7):
-            leds.set_prog_led(i, True)
+        leds.set_mask(0b111111)
         time.sleep(1.0)
 
         log.info("Toutes OFF")
@@ -16,11 +16,14 @@ def main() -> None:
 
     print("Test LED1 (MCP1 A2) blink 5 fois")
     led1 = McpPin("mcp1", "A", 2)
-    for _ in range(5):
-        mcp.write_pin(led1, 1)
-        time.sleep(0.2)
-        mcp.write_pin(led1, 0)
-        time.sleep(0.2)
+    # échéances absolues: la durée des écritures I2C ne rallonge pas la période
+    next_t = time.monotonic()
+    for i in range(10):
+        mcp.write_pin(led1, 1 - i % 2)
+        next_t += 0.2
+        dt = next_t - time.monotonic()
+        if dt > 0:
+            time.sleep(dt)
 
     print("Test motor1 ENA enable 1s puis disable")
     mcp.motor_set_enable(1, True)
@@ -0,0 +1,55 @@
+# tests/test_stepgen_ramp.py
+from __future__ import annotations
+
+from driver.stepgen_lgpio import MotionProfile, StepGenLgpio, StepTiming
+
+# Ecart de vitesse max entre deux paliers tx_pulse voisins: celui des deux premiers
+# pas de la rampe elle-même (v = sqrt(2 a s) => v2 / v1 = sqrt(2)).
+MAX_RATIO = 2 ** 0.5 + 1e-3
+
+# (pas, vmax steps/s, accel steps/s^2): cas trapézoïdaux, triangulaires et rampe longue
+CASES = (
+    (3200, 4000.0, 8000.0),
+    (3200, 16000.0, 30000.0),
+    (400, 4000.0, 8000.0),
+    (20000, 8000.0, 2000.0),
+    (10, 1000.0, 500.0),
+)
+
+
+class _NoGpio:
+    """Pas de GPIO: seul le calcul des paliers est testé (aucune impulsion émise)."""
+
+    def supports_tx_pulse(self) -> bool:
+        return True
+
+    def claim_output(self, bcm: int, initial: int = 0) -> None:
+        pass
+
+
+def test_ramp_segments_velocity_ratio() -> None:
+    sg = StepGenLgpio(_NoGpio(), step_pins={}, timing=StepTiming())
+    for steps, vmax, accel in CASES:
+        profile = MotionProfile(max_steps_s=vmax, accel_steps_s2=accel)
+        segments = sg._pulse_segments(steps, profile)
+        periods = sg._period_schedule(steps, profile)
+
+        assert sum(n for _, n in segments) == steps, (steps, vmax, accel)
+        for (p1, _), (p2, _) in zip(segments, segments[1:]):
+            ratio = max(p1, p2) / min(p1, p2)
+            assert ratio <= MAX_RATIO, (steps, vmax, accel, p1, p2, ratio)
+
+        # durée du mouvement conservée (période moyenne par palier)
+        total_ns = sum(p * n for p, n in segments)
+        assert abs(total_ns - sum(periods)) <= len(segments) * 1000, (steps, vmax, accel)
+
+        print(f"{steps} pas @ {vmax:.0f} steps/s, {accel:.0f} steps/s2: {len(segments)} paliers OK")
+
+
+def main() -> None:
+    test_ramp_segments_velocity_ratio()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
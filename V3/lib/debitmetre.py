@@ -11,6 +11,9 @@ try:
 except Exception as e:  # pragma: no cover
     raise ImportError("lgpio is required. Install python3-lgpio on Raspberry Pi OS.") from e
 
+# Historique d'horodatages borné (purge par fenêtre faite dans flow_lpm, pas dans le callback)
+_PULSE_HISTORY_MAX = 4096
+
 class FlowMeterError(Exception):
     pass
 
@@ -37,12 +40,14 @@ class FlowMeter:
             raise ValueError("filter_us must be >= 0")
 
         self.config = config
+        # config figée: 1/K calculé une fois (litres par impulsion)
+        self._liters_per_pulse = 1.0 / float(config.pulses_per_liter)
         self._chip: Optional[int] = None
         self._cb = None  # lgpio callback object
 
         self._lock = Lock()
         self._pulse_count_total: int = 0
-        self._pulse_times: Deque[float] = deque()  # monotonic timestamps (seconds)
+        self._pulse_times: Deque[float] = deque(maxlen=_PULSE_HISTORY_MAX)  # monotonic timestamps (seconds)
 
     # -----------------
     # lifecycle
@@ -130,16 +135,13 @@ class FlowMeter:
     # callback
     # -----------------
     def _on_edge(self, chip: int, gpio: int, level: int, tick: int) -> None:
+        # anti-rebond déjà fait par lgpio (filter_us): comptage + horodatage seulement.
+        # Mémoire bornée par maxlen, purge par fenêtre dans flow_lpm().
         now = time.monotonic()
         with self._lock:
             self._pulse_count_total += 1
             self._pulse_times.append(now)
 
-            # purge pour limiter la mémoire (2x fenêtre par défaut)
-            cutoff = now - (self.config.window_s_default * 2.0)
-            while self._pulse_times and self._pulse_times[0] < cutoff:
-                self._pulse_times.popleft()
-
     # -----------------
     # public API
     # -----------------
@@ -155,7 +157,7 @@ class FlowMeter:
     def total_liters(self) -> float:
         with self._lock:
             pulses = self._pulse_count_total
-        return float(pulses) / float(self.config.pulses_per_liter)
+        return pulses * self._liters_per_pulse
 
     def flow_lpm(self, window_s: Optional[float] = None) -> float:
         self._require_open()
@@ -172,5 +174,4 @@ class FlowMeter:
                 self._pulse_times.popleft()
             pulses_in_window = len(self._pulse_times)
 
-        liters_per_s = (float(pulses_in_window) / float(self.config.pulses_per_liter)) / w
-        return liters_per_s * 60.0
\ No newline at end of file
+        return pulses_in_window * self._liters_per_pulse * 60.0 / w
\ No newline at end of file
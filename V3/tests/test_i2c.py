@@ -53,24 +53,36 @@ def print_inputs(io: IOBoard) -> None:
     print(f"PRG={prg} | VIC={vic} | AIR={air}")
 
 
+def sleep_until(deadline: float) -> None:
+    """Attend jusqu'à l'échéance absolue (monotonic): le temps I2C ne décale pas le pas suivant."""
+    dt = deadline - time.monotonic()
+    if dt > 0:
+        time.sleep(dt)
+
+
 def demo_outputs(io: IOBoard) -> None:
-    # LEDs: chenillard 1..6
+    # LEDs: chenillard 1..6 (pas de 150 ms, échéances absolues)
+    next_t = time.monotonic()
     for i in range(1, 7):
+        next_t += 0.15
         for k in range(1, 7):
             io.set_led(k, OFF)
         io.set_led(i, ON)
-        time.sleep(0.15)
+        sleep_until(next_t)
 
     # ENA/DIR: pulse ENA1..ENA8 + alternance DIR ouverture/fermeture
     for m in range(1, 9):
         io.set_ena(m, OFF)
 
+    next_t = time.monotonic()
     for m in range(1, 9):
         io.set_dir(m, "ouverture" if (m % 2 == 1) else "fermeture")
         io.set_ena(m, ON)
-        time.sleep(0.20)
+        next_t += 0.20
+        sleep_until(next_t)
         io.set_ena(m, OFF)
-        time.sleep(0.05)
+        next_t += 0.05
+        sleep_until(next_t)
 
 
 def all_off(io: IOBoard) -> None:
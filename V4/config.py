@@ -46,6 +46,9 @@ RELAY_AIR_GPIO: int = 20
 # ============================================================
 
 I2C_BUS_ID: int = 1
+# Fréquence attendue (le noyau la fixe: dtparam=i2c_arm_baudrate=400000 dans
+# /boot/firmware/config.txt pour 400 kHz, puis mettre 400_000 ici).
+# test_i2c_scan.py compare avec la valeur réelle du noyau.
 I2C_FREQ_HZ: int = 100_000
 I2C_RETRIES: int = 2
 I2C_RETRY_DELAY_S: float = 0.01
@@ -97,8 +97,7 @@ class IOBoard:
         self._mcp3_olat_b = 0x00
 
         self.mcp1.write_port("A", self._mcp1_olat_a)
-        self.mcp3.write_port("A", self._mcp3_olat_a)
-        self.mcp3.write_port("B", self._mcp3_olat_b)
+        self.mcp3.write_ports(self._mcp3_olat_a, self._mcp3_olat_b)
 
     # ============================================================
     # LEDs — MCP1 Port A, pins A2..A7 (actif haut)
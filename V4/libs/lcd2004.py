@@ -24,11 +24,41 @@ Usage :
 from __future__ import annotations
 
 import time
+import unicodedata
+from typing import List, Optional, Sequence
 
 import config
 from libs.i2c_bus import I2CBus
 
 
+# ============================================================
+# Jeu de caractères (CGROM A00)
+# ============================================================
+
+# Glyphes non-ASCII présents dans la CGROM A00 (ROM standard des HD44780)
+_A00_GLYPHS = {"°": 0xDF, "ä": 0xE1, "ß": 0xE2, "µ": 0xE4, "ö": 0xEF, "ü": 0xF5, "÷": 0xFD}
+
+
+def _build_a00_table() -> dict[int, str]:
+    """
+    Table str.translate : latin-1 -> CGROM A00, un caractère en sortie pour un en entrée
+    (colonnes inchangées). Les accents absents de la ROM ("é", "à", "ç"...) deviennent
+    la lettre de base; le reste non imprimable devient "?".
+    """
+    table = {}
+    for cp in range(0x80, 0x100):
+        base = unicodedata.normalize("NFKD", chr(cp))[:1]
+        table[cp] = base if base.isascii() and base.isprintable() else "?"
+    for ch, code in _A00_GLYPHS.items():
+        table[ord(ch)] = chr(code)
+    # typographie courante hors latin-1
+    table.update({0x2018: "'", 0x2019: "'", 0x2013: "-", 0x2014: "-", 0x0152: "O", 0x0153: "o"})
+    return table
+
+
+_A00_TABLE = _build_a00_table()
+
+
 # ============================================================
 # Driver LCD2004
 # ============================================================
@@ -65,8 +95,11 @@ class LCD2004:
     _BIT_E  = 0x04
     _BIT_BL = 0x08
 
+    # États PCF8574 par write_block (5 octets LCD x 6 états <= 1 + 32 octets SMBus)
+    _BURST_STATES = 30
+
     # Offsets DDRAM des 4 lignes (20x4)
-    _ROW_OFFSETS = [0x00, 0x40, 0x14, 0x54]
+    _ROW_OFFSETS = (0x00, 0x40, 0x14, 0x54)
 
     def __init__(
         self,
@@ -81,6 +114,13 @@ class LCD2004:
         self.rows = int(rows)
         self._backlight: bool = True
 
+        # ligne acceptée (0..rows-1 ou 1..rows, le 1-based prime) -> index 0-based
+        self._line_index = {l: l - 1 if 1 <= l <= self.rows else l for l in range(self.rows + 1)}
+
+        # contenu affiché par ligne (None = inconnu): une ligne identique n'est pas renvoyée
+        self._line_cache: List[Optional[str]] = [None] * self.rows
+        self._blank = " " * self.cols  # clear_line: aucune allocation par appel
+
     # ---- init ----
 
     def init(self) -> None:
@@ -112,11 +152,11 @@ class LCD2004:
         """Efface tout l'écran."""
         self._command(self._CMD_CLEAR)
         time.sleep(0.002)
+        self._line_cache = [None] * self.rows
 
     def clear_line(self, line: int) -> None:
         """Efface une ligne (remplie d'espaces)."""
-        self.set_cursor(line, 0)
-        self._write_text(" " * self.cols)
+        self.write_line(line, self._blank)
 
     def backlight(self, enabled: bool) -> None:
         """Active ou désactive le rétroéclairage."""
@@ -138,29 +178,63 @@ class LCD2004:
         self.write_line(line, text, center=True)
 
     def write_line(self, line: int, text: str, center: bool = False) -> None:
-        """Écrit du texte sur une ligne, avec centrage optionnel."""
+        """
+        Écrit du texte sur une ligne, avec centrage optionnel.
+        Seuls les caractères qui diffèrent de la ligne affichée sont renvoyés
+        (aucun trafic I2C si identique; cache invalidé par clear()).
+        """
         s = (text or "")
         s = self._center(s, self.cols) if center else s[: self.cols].ljust(self.cols)
-        self.set_cursor(line, 0)
-        self._write_text(s)
+        line0 = self._norm_line(line)
+        old = self._line_cache[line0]
+        if old == s:
+            return
+        i, j = (0, len(s)) if old is None else self._diff_span(old, s)
+        # inconnu pendant l'écriture: une erreur I2C en cours de ligne ne laisse pas un cache faux
+        self._line_cache[line0] = None
+        self._write_at(self._ROW_OFFSETS[line0] + i, s[i:j])
+        self._line_cache[line0] = s
+
+    def write_value_at(self, line: int, col: int, value, width: Optional[int] = None) -> None:
+        """
+        Écrit value à partir de col sans réécrire le reste de la ligne (compteurs, durées).
+        width : aligné à droite sur width caractères (efface les chiffres d'une valeur plus longue).
+        Ligne connue : passe par write_line, seuls les caractères modifiés partent sur l'I2C.
+        """
+        s = str(value) if width is None else str(value).rjust(width)
+        c = max(0, min(self.cols - 1, int(col)))
+        s = s[: self.cols - c]
+        line0 = self._norm_line(line)
+        old = self._line_cache[line0]
+        if old is not None:
+            self.write_line(line, old[:c] + s + old[c + len(s):])
+            return
+        # reste de la ligne inconnu: écriture directe, cache laissé à None
+        self._write_at(self._ROW_OFFSETS[line0] + c, s)
 
     # ---- internals ----
 
     def _norm_line(self, line: int) -> int:
         """Accepte 0..rows-1 ou 1..rows. Retourne index 0-based."""
-        l = int(line)
-        if 1 <= l <= self.rows:
-            l -= 1
-        if not (0 <= l < self.rows):
-            raise ValueError(f"line doit être dans 0..{self.rows - 1} (ou 1..{self.rows})")
-        return l
+        try:
+            return self._line_index[int(line)]
+        except KeyError:
+            raise ValueError(f"line doit être dans 0..{self.rows - 1} (ou 1..{self.rows})") from None
+
+    @staticmethod
+    def _diff_span(old: str, new: str) -> tuple[int, int]:
+        """Plage [i, j) de new qui diffère de old (même longueur): préfixe et suffixe communs exclus."""
+        i, j = 0, len(new)
+        while i < j and old[i] == new[i]:
+            i += 1
+        while j > i and old[j - 1] == new[j - 1]:
+            j -= 1
+        return i, j
 
     @staticmethod
     def _center(s: str, width: int) -> str:
-        s2 = s[:width]
-        pad = max(0, width - len(s2))
-        left = pad // 2
-        return (" " * left) + s2 + (" " * (pad - left))
+        # une seule allocation; marge gauche = pad // 2 pour une largeur paire (20)
+        return s[:width].center(width)
 
     def _expander_write(self, data: int) -> None:
         bl = self._BIT_BL if self._backlight else 0
@@ -168,30 +242,57 @@ class LCD2004:
         bus = self.bus._require_open()
         self.bus._run("lcd_write_byte", self.address, lambda: bus.write_byte(self.address, byte))
 
-    def _pulse_enable(self, data: int) -> None:
-        self._expander_write(data | self._BIT_E)
-        time.sleep(0.0005)
-        self._expander_write(data & ~self._BIT_E)
-        time.sleep(0.0001)
+    def _expander_burst(self, states: Sequence[int]) -> None:
+        """
+        Plusieurs états PCF8574 en une seule transaction (write_i2c_block_data).
+        Le PCF8574 n'a pas de registre: l'octet "reg" SMBus est latché comme les suivants.
+        Le temps I2C par octet (~90 us à 100 kHz) couvre l'impulsion E et les 37 us
+        d'exécution HD44780: pas de sleep.
+        """
+        bl = self._BIT_BL if self._backlight else 0
+        self.bus.write_block(self.address, states[0] | bl, [s | bl for s in states[1:]])
 
     def _write4bits(self, nibble: int, rs: bool) -> None:
         data = int(nibble) & 0xF0
         if rs:
             data |= self._BIT_RS
-        self._expander_write(data)
-        self._pulse_enable(data)
+        self._expander_burst((data, data | self._BIT_E, data))
 
-    def _send(self, value: int, rs: bool) -> None:
+    def _byte_states(self, value: int, rs: bool) -> tuple[int, ...]:
+        """Octet -> 6 états PCF8574 (nibble haut puis bas, E bas / haut / bas), sans backlight."""
         v = int(value) & 0xFF
-        self._write4bits(v & 0xF0, rs=rs)
-        self._write4bits((v << 4) & 0xF0, rs=rs)
+        rs_bit = self._BIT_RS if rs else 0
+        high = (v & 0xF0) | rs_bit
+        low = ((v << 4) & 0xF0) | rs_bit
+        e = self._BIT_E
+        return (high, high | e, high, low, low | e, low)
+
+    def _send(self, value: int, rs: bool) -> None:
+        self._expander_burst(self._byte_states(value, rs))
 
     def _command(self, cmd: int) -> None:
         self._send(cmd, rs=False)
 
     def _write_char(self, ch: str) -> None:
-        self._send(ord(ch) & 0xFF, rs=True)
+        self._write_text(ch)
 
     def _write_text(self, s: str) -> None:
-        for ch in s:
-            self._write_char(ch)
+        self._send_states(self._text_states(s))
+
+    def _write_at(self, ddram: int, s: str) -> None:
+        """Adresse DDRAM + texte dans le même flux d'états (une transaction par 5 octets)."""
+        self._send_states(list(self._byte_states(self._CMD_SET_DDRAM | ddram, False)) + self._text_states(s))
+
+    def _text_states(self, s: str) -> list[int]:
+        # traduit (A00) et encodé une fois: itération sur des int, sans ord() par caractère
+        states: list[int] = []
+        for b in s.translate(_A00_TABLE).encode("latin-1", "replace"):
+            states.extend(self._byte_states(b, rs=True))
+        return states
+
+    def _send_states(self, states: Sequence[int]) -> None:
+        # write_block: 1 octet "reg" + 32 de données max -> 5 octets LCD (30 états) par transaction,
+        # coupure sur une frontière d'octet LCD
+        step = self._BURST_STATES
+        for k in range(0, len(states), step):
+            self._expander_burst(states[k:k + step])
@@ -22,6 +22,7 @@ import libs.gpio_handle as gpio_handle
 from libs.buzzer import Buzzer
 
 TIME_SLEEP = 1.0  # délai entre tests (secondes)
+_SWEEP_FREQS = (500, 1000, 1500, 2000, 2500, 3000, 3500, 4000, 4500)  # balayage test 4 (Hz)
 
 def main() -> None:
     gpio_handle.init()
@@ -47,8 +48,7 @@ def main() -> None:
 
         # --- 4. Balayage fréquentiel ---
         print("Test 4 : balayage fréquentiel (500 → 4500 Hz)")
-        steps = [500, 1000, 1500, 2000, 2500, 3000, 3500, 4000, 4500]
-        for freq in steps:
+        for freq in _SWEEP_FREQS:
             print(f"  {freq} Hz")
             bz.beep(time_ms=400, power_pct=70, repeat=1, freq_hz=freq, gap_ms=100)
 
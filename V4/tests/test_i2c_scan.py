@@ -33,11 +33,21 @@ EXPECTED: dict[int, str] = {
 
 
 def main() -> None:
-    print(f"Scan I2C — bus {config.I2C_BUS_ID} @ {config.I2C_FREQ_HZ // 1000} kHz\n")
+    print(f"Scan I2C — bus {config.I2C_BUS_ID} @ {config.I2C_FREQ_HZ // 1000} kHz (config)")
 
     with I2CBus() as bus:
+        kernel_hz = bus.kernel_freq_hz()
         found = bus.scan()
 
+    if kernel_hz is None:
+        print("Horloge noyau : non exposée\n")
+    else:
+        print(f"Horloge noyau : {kernel_hz // 1000} kHz")
+        if kernel_hz < config.I2C_FREQ_HZ:
+            print(f"  ATTENTION : inférieure à config.I2C_FREQ_HZ "
+                  f"(dtparam=i2c_arm_baudrate={config.I2C_FREQ_HZ} dans /boot/firmware/config.txt)")
+        print()
+
     # Résultats bruts
     print(f"Adresses détectées ({len(found)}) :")
     for addr in found:
@@ -33,6 +33,13 @@ except Exception as e:  # pragma: no cover
     raise ImportError("lgpio est requis. Installer python3-lgpio.") from e
 
 
+def _sleep_until(deadline: float) -> None:
+    """Attend jusqu'à l'échéance absolue (time.monotonic)."""
+    dt = deadline - time.monotonic()
+    if dt > 0:
+        time.sleep(dt)
+
+
 # ============================================================
 # Exceptions
 # ============================================================
@@ -112,12 +119,17 @@ class Buzzer:
 
     # ---- bas-niveau ----
 
-    def _apply_pwm(self, freq_hz: int, duty_pct: int) -> None:
+    def _apply_pwm(self, freq_hz: int, duty_pct: int, time_ms: int = 0) -> None:
+        """
+        time_ms > 0 : lgpio arrête lui-même le PWM après time_ms (pulse_cycles),
+        la fin du son ne dépend pas du réveil du thread Python.
+        """
         chip = self._require_open()
         f = max(config.BUZZER_FREQ_MIN_HZ, min(config.BUZZER_FREQ_MAX_HZ, int(freq_hz)))
         d = max(0, min(100, int(duty_pct)))
+        cycles = max(1, round(f * time_ms / 1000)) if time_ms > 0 else 0
         try:
-            lgpio.tx_pwm(chip, self.gpio, f, d)
+            lgpio.tx_pwm(chip, self.gpio, f, d, 0, cycles)
         except Exception as e:
             raise BuzzerError(
                 f"tx_pwm échoué (gpio={self.gpio}, freq={f}Hz, duty={d}%): {e}"
@@ -156,12 +168,16 @@ class Buzzer:
         r    = max(1, min(100, int(repeat)))
         gap  = max(0, min(10_000, int(gap_ms)))
 
+        # échéances absolues: la durée des appels tx_pwm ne s'ajoute pas aux bips/pauses
+        t = time.monotonic()
         for i in range(r):
-            self._apply_pwm(freq_hz, power_pct)
-            time.sleep(t_ms / 1000.0)
+            self._apply_pwm(freq_hz, power_pct, t_ms)
+            t += t_ms / 1000.0
+            _sleep_until(t)
             self.off()
             if gap > 0 and i < r - 1:
-                time.sleep(gap / 1000.0)
+                t += gap / 1000.0
+                _sleep_until(t)
 
     def play(self, sequence: Sequence[Tuple[int, int, int, int]]) -> None:
         """
@@ -173,12 +189,17 @@ class Buzzer:
             bz.play([(2000, 80, 70, 40), (2500, 80, 70, 80)])
         """
         self._require_open()
+        # échéances absolues: la séquence dure exactement la somme des time_ms + gap_ms
+        t = time.monotonic()
         for freq_hz, time_ms, power_pct, gap_ms in sequence:
-            self._apply_pwm(int(freq_hz), int(power_pct))
-            time.sleep(max(1, int(time_ms)) / 1000.0)
+            t_ms = max(1, int(time_ms))
+            self._apply_pwm(int(freq_hz), int(power_pct), t_ms)
+            t += t_ms / 1000.0
+            _sleep_until(t)
             self.off()
             if int(gap_ms) > 0:
-                time.sleep(int(gap_ms) / 1000.0)
+                t += int(gap_ms) / 1000.0
+                _sleep_until(t)
 
     def ringtone_startup(self) -> None:
         """Sonnerie de démarrage (~5 secondes, montée progressive)."""
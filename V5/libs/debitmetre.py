@@ -35,6 +35,10 @@ except Exception as e:  # pragma: no cover
     raise ImportError("lgpio est requis. Installer python3-lgpio.") from e
 
 
+# Historique d'horodatages borné (purge par fenêtre faite dans flow_lpm, pas dans le callback)
+_PULSE_HISTORY_MAX = 4096
+
+
 # ============================================================
 # Exceptions
 # ============================================================
@@ -79,7 +83,7 @@ class FlowMeter:
 
         self._lock = Lock()
         self._pulse_count_total: int = 0
-        self._pulse_times: Deque[float] = deque()  # timestamps monotonic
+        self._pulse_times: Deque[float] = deque(maxlen=_PULSE_HISTORY_MAX)  # timestamps monotonic
 
     # ---- lifecycle ----
 
@@ -152,14 +156,12 @@ class FlowMeter:
     # ---- callback (thread interne lgpio) ----
 
     def _on_edge(self, chip: int, gpio: int, level: int, tick: int) -> None:
+        # anti-rebond déjà fait par lgpio (filter_us): comptage + horodatage seulement.
+        # Mémoire bornée par maxlen, purge par fenêtre dans flow_lpm().
         now = time.monotonic()
         with self._lock:
             self._pulse_count_total += 1
             self._pulse_times.append(now)
-            # purge pour limiter la mémoire (fenêtre 2x)
-            cutoff = now - 2.0
-            while self._pulse_times and self._pulse_times[0] < cutoff:
-                self._pulse_times.popleft()
 
     # ---- API publique ----
 
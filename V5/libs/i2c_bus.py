@@ -24,6 +24,7 @@ from __future__ import annotations
 
 import time
 from dataclasses import dataclass
+from pathlib import Path
 from typing import List, Optional, Sequence
 
 import config
@@ -146,6 +147,21 @@ class I2CBus:
             )
         return self._bus
 
+    def kernel_freq_hz(self) -> Optional[int]:
+        """
+        Fréquence SCL réellement configurée par le noyau (device tree), indépendante
+        de config.freq_hz qui n'est que la valeur attendue.
+        Retourne None si non exposée (/sys/.../of_node/clock-frequency absent).
+        """
+        path = Path(f"/sys/class/i2c-adapter/i2c-{self.config.bus_id}/of_node/clock-frequency")
+        try:
+            raw = path.read_bytes()
+        except OSError:
+            return None
+        if len(raw) != 4:
+            return None
+        return int.from_bytes(raw, "big")
+
     # ---- retry engine ----
 
     def _run(self, op_name: str, addr: int, fn):
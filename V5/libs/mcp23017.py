@@ -63,6 +63,8 @@ class MCP23017:
     def __init__(self, bus: I2CBus, address: int) -> None:
         self.bus = bus
         self.address = int(address) & 0x7F
+        # copie des latches OLAT écrits ("A"/"B" -> octet): write_pin sans relecture I2C
+        self._olat: dict[str, int] = {}
 
     # ---- init ----
 
@@ -74,6 +76,8 @@ class MCP23017:
         Raises:
             DeviceError si le device ne répond pas.
         """
+        # (ré)init: latches relus au prochain write_pin
+        self._olat.clear()
         try:
             if force:
                 self.bus.write_u8(self.address, self._REG_IOCON, 0x00)
@@ -158,17 +162,38 @@ class MCP23017:
 
     def write_port(self, port: str, value: int) -> None:
         """Écrit le latch de sortie OLAT d'un port entier."""
-        self.bus.write_u8(self.address, self._reg_olat(port), int(value) & 0xFF)
+        p = self._norm_port(port)
+        v = int(value) & 0xFF
+        # retiré pendant l'écriture: une erreur I2C ne laisse pas une copie fausse
+        self._olat.pop(p, None)
+        self.bus.write_u8(self.address, self._reg_olat(p), v)
+        self._olat[p] = v
+
+    def write_ports(self, value_a: int, value_b: int) -> None:
+        """
+        Écrit OLATA puis OLATB en une seule transaction I2C
+        (auto-incrément d'adresse, BANK=0 / SEQOP=0 par défaut).
+        """
+        a = int(value_a) & 0xFF
+        b = int(value_b) & 0xFF
+        self._olat.clear()
+        self.bus.write_block(self.address, self._REG_OLATA, [a, b])
+        self._olat["A"] = a
+        self._olat["B"] = b
 
     def write_pin(self, port: str, pin: int, value: int) -> None:
-        """Read-modify-write sur OLAT pour une seule pin."""
+        """
+        Modifie une seule pin du latch OLAT.
+        Valeur courante prise dans la copie locale (lecture OLAT seulement si inconnue):
+        une seule transaction I2C par appel.
+        """
         p = self._norm_port(port)
         b = self._check_pin(pin)
-        reg = self._reg_olat(p)
-        cur = self.bus.read_u8(self.address, reg)
+        cur = self._olat.get(p)
+        if cur is None:
+            cur = self.bus.read_u8(self.address, self._reg_olat(p))
         bit = 1 << b
-        new = (cur | bit) if int(value) else (cur & (~bit & 0xFF))
-        self.bus.write_u8(self.address, reg, new)
+        self.write_port(p, (cur | bit) if int(value) else (cur & (~bit & 0xFF)))
 
     # ---- entrées ----
 
@@ -47,6 +47,13 @@ from libs.buzzer import Buzzer
 
 _COLS = config.LCD_COLS  # 20
 
+# Paliers du balayage (phase 3): 12 fréquences de BUZZER_FREQ_MIN_HZ à BUZZER_FREQ_MAX_HZ,
+# calculées une fois à l'import
+_SWEEP_STEP = (config.BUZZER_FREQ_MAX_HZ - config.BUZZER_FREQ_MIN_HZ) // 11
+_SWEEP_FREQS: tuple[int, ...] = tuple(
+    range(config.BUZZER_FREQ_MIN_HZ, config.BUZZER_FREQ_MAX_HZ + 1, _SWEEP_STEP)
+)[:12]
+
 
 # ============================================================
 # Helpers
@@ -136,8 +143,7 @@ def phase2_repeat(lcd: LCD2004, bz: Buzzer) -> None:
 
 def phase3_frequence(lcd: LCD2004, bz: Buzzer) -> None:
     _sep("PHASE 3 — BALAYAGE FREQUENCE (500 -> 4500 Hz)")
-    step = (config.BUZZER_FREQ_MAX_HZ - config.BUZZER_FREQ_MIN_HZ) // 11
-    freqs = list(range(config.BUZZER_FREQ_MIN_HZ, config.BUZZER_FREQ_MAX_HZ + 1, step))[:12]
+    freqs = _SWEEP_FREQS
 
     print(f"  Plage   : {config.BUZZER_FREQ_MIN_HZ} - {config.BUZZER_FREQ_MAX_HZ} Hz")
     print(f"  Paliers : {freqs}")
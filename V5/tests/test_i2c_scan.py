@@ -39,8 +39,16 @@ def main() -> None:
     print(f"  Attendus : {[hex(a) for a in _EXPECTED]}\n")
 
     with I2CBus() as bus:
+        kernel_hz = bus.kernel_freq_hz()
         found = bus.scan()
 
+    kernel_str = "non exposée" if kernel_hz is None else f"{kernel_hz // 1000} kHz"
+    print(f"  Horloge : {kernel_str} (config {config.I2C_FREQ_HZ // 1000} kHz)")
+    if kernel_hz is not None and kernel_hz < config.I2C_FREQ_HZ:
+        print(f"  ATTENTION : horloge noyau < config "
+              f"(dtparam=i2c_arm_baudrate={config.I2C_FREQ_HZ} dans /boot/firmware/config.txt)")
+    print()
+
     print(f"  Adresses détectées ({len(found)}) :")
     for addr in found:
         label = _EXPECTED.get(addr, "")